@@ -1,9 +1,11 @@
 from __future__ import annotations
 from langchain.agents import initialize_agent, AgentType
+from langgraph.prebuilt import create_react_agent
 from app.agent.tools import (
     list_docs,
     get_topics,
     get_document,
+    get_document_chunk,
     document_stats,
     compare_documents,
     search,
@@ -11,14 +13,37 @@ from app.agent.tools import (
     get_user_history,
 )
 from app.agent.llm_backend import get_llm_backend
+from app.core.config import get_settings
 from functools import lru_cache
 
 
+class _GraphAgentRunner:
+    """Adapt a LangGraph agent to the `arun(prompt)` interface used by the routers."""
+
+    def __init__(self, graph, recursion_limit: int = 30):
+        self._graph = graph
+        self._recursion_limit = recursion_limit
+
+    async def arun(self, prompt: str) -> str:
+        result = await self._graph.ainvoke(
+            {"messages": [("user", prompt)]},
+            config={"recursion_limit": self._recursion_limit},
+        )
+        return result["messages"][-1].content
+
+
 @lru_cache()
 def get_agent():
-    """Get the configured LangChain agent."""
+    """Get the configured LangChain agent.
+
+    Backends with native function calling get a LangGraph tool-calling agent,
+    which lets the model emit several tool calls in a single turn and have
+    them dispatched concurrently. Ollama falls back to the sequential
+    structured-chat ReAct agent, which works with plain-text models.
+    """
     tools = [
         get_document,
+        get_document_chunk,
         list_docs,
         get_topics,
         document_stats,
@@ -29,12 +54,16 @@ def get_agent():
     ]
 
     llm = get_llm_backend()
+    settings = get_settings()
+
+    if settings.model_backend == "ollama":
+        return initialize_agent(
+            tools,
+            llm,
+            agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=True,
+            max_iterations=30,
+            max_execution_time=120,
+        )
 
-    return initialize_agent(
-        tools,
-        llm,
-        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
-        max_iterations=30,
-        max_execution_time=120,
-    )
+    return _GraphAgentRunner(create_react_agent(llm, tools), recursion_limit=30)
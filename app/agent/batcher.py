@@ -0,0 +1,86 @@
+"""
+Micro-batching for agent prompts.
+
+Prompts arriving within a short window are dispatched to the agent together
+instead of one serial run per request, so concurrent API calls overlap
+their LLM round-trips. New prompts are admitted every loop tick rather than
+waiting for the previous batch to drain.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from app.agent.agent import get_agent
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 8  # prompts dispatched together
+MAX_WAIT_MS = 20  # how long to wait for stragglers before dispatching
+
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+
+async def submit(prompt: str) -> str:
+    """Submit a prompt and wait for its result.
+
+    The background batching worker is started lazily on first use so the
+    module can be imported without a running event loop.
+    """
+    global _queue, _worker
+    if _queue is None:
+        _queue = asyncio.Queue()
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_run())
+
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    await _queue.put((prompt, future))
+    return await future
+
+
+async def _collect_batch(queue: asyncio.Queue) -> List[Tuple[str, asyncio.Future]]:
+    """Pop up to MAX_BATCH items, waiting at most MAX_WAIT_MS for more."""
+    batch = [await queue.get()]
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_WAIT_MS / 1000
+    while len(batch) < MAX_BATCH:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+    return batch
+
+
+async def _run():
+    """Background worker: drain the queue in micro-batches."""
+    while True:
+        batch = await _collect_batch(_queue)
+        try:
+            agent = get_agent()
+
+            # Both agent flavours expose arun(prompt) -> str; dispatching the
+            # batch concurrently gives the multiplexing win without relying
+            # on abatch's dict-shaped inputs/outputs
+            results = await asyncio.gather(
+                *(agent.arun(prompt) for prompt, _ in batch),
+                return_exceptions=True,
+            )
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"Error processing agent batch: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
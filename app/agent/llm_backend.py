@@ -3,12 +3,29 @@ Common LLM utilities to avoid circular imports.
 This module contains shared LLM functionality used across different parts of the application.
 """
 
+from functools import lru_cache
+
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_ollama import OllamaLLM
 from langchain_google_genai import ChatGoogleGenerativeAI
 from app.core.config import get_settings
 
 
+@lru_cache(maxsize=1)
+def _get_shared_async_client() -> httpx.AsyncClient:
+    """Return one long-lived HTTP client shared by all LLM calls.
+
+    HTTP/2 multiplexes concurrent completions over a single connection and
+    the generous pool limits let parallel tool dispatch reuse warm
+    connections instead of paying a TLS handshake per request.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+
+
 def get_llm_backend():
     """Get the configured LLM backend."""
     settings = get_settings()
@@ -17,7 +34,12 @@ def get_llm_backend():
         if not settings.openai_api_key:
             raise ValueError("OpenAI API key is required but not provided in settings")
 
-        return ChatOpenAI(api_key=settings.openai_api_key, model="gpt-3.5-turbo", temperature=0.1)
+        return ChatOpenAI(
+            api_key=settings.openai_api_key,
+            model="gpt-3.5-turbo",
+            temperature=0.1,
+            http_async_client=_get_shared_async_client(),
+        )
     elif settings.model_backend == "ollama":
         return OllamaLLM(model=settings.ollama_model)
     elif settings.model_backend == "gemini":
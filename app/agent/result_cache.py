@@ -0,0 +1,51 @@
+"""
+TTL cache for per-document agent results.
+
+Summary and topic requests re-prompt the LLM even when the document hasn't
+changed, turning a dict lookup's worth of work into a multi-second call.
+Results are keyed by (doc_id, request shape) and dropped when the watcher
+upserts or deletes the document, with a TTL as a backstop.
+"""
+
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+_CACHE: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+_DOC_KEYS: Dict[str, Set[tuple]] = defaultdict(set)
+
+_MAX_ENTRIES = 10_000
+_TTL = 3600.0  # seconds
+
+
+def get(key: tuple) -> Optional[Any]:
+    """Return the cached result for a (doc_id, ...) key, or None."""
+    entry = _CACHE.get(key)
+    if entry is None:
+        return None
+
+    stored_at, value = entry
+    if time.monotonic() - stored_at >= _TTL:
+        _CACHE.pop(key, None)
+        _DOC_KEYS[key[0]].discard(key)
+        return None
+
+    _CACHE.move_to_end(key)
+    return value
+
+
+def put(key: tuple, value: Any) -> None:
+    """Cache a result under a (doc_id, ...) key, evicting LRU entries."""
+    _CACHE[key] = (time.monotonic(), value)
+    _CACHE.move_to_end(key)
+    _DOC_KEYS[key[0]].add(key)
+
+    while len(_CACHE) > _MAX_ENTRIES:
+        old_key, _ = _CACHE.popitem(last=False)
+        _DOC_KEYS[old_key[0]].discard(old_key)
+
+
+def invalidate(doc_id: str) -> None:
+    """Drop every cached result for a document."""
+    for key in _DOC_KEYS.pop(doc_id, set()):
+        _CACHE.pop(key, None)
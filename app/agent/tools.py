@@ -3,11 +3,205 @@ from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from langchain.tools import tool
 from app.db.factory import get_database
-from app.db.user_handler import UserDbHandler
+from app.db.user_handler import get_user_service
 from datetime import datetime
+from functools import lru_cache
+import asyncio
+import heapq
+import json
 import os
 import re
-from collections import Counter
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+
+# Compiled once at import time; the tools below scan potentially large
+# document texts, so avoid the per-call regex cache lookup.
+_WORD_RE = re.compile(r"\b\w+\b")
+_SENT_RE = re.compile(r"[.!?]+")
+_PARA_RE = re.compile(r"\n\s*\n")
+_LOWER_WORD_RE = re.compile(r"\b[a-z]{3,}\b")
+
+# Cached search results keyed by (normalized query, limit). Agent loops often
+# retry the same query; the TTL bounds staleness if invalidation is missed
+# (e.g. the watcher runs in a separate process).
+_SEARCH_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_SEARCH_CACHE_MAX = 256
+_SEARCH_CACHE_TTL = 60.0  # seconds
+
+
+# Inverted index over document metadata terms (keywords, topics and title
+# tokens) -> set of doc ids. Lets search score only candidate documents
+# instead of fetching the whole corpus. Stored as (built_at, index); None
+# means "needs rebuild". Ingestion runs in the watcher process, so its
+# in-memory invalidations never reach this process — the TTL bounds how
+# long new or deleted documents stay invisible to search.
+_INV_INDEX: Optional[tuple] = None
+_INV_INDEX_TTL = 60.0  # seconds
+
+
+async def _get_inverted_index(repo) -> Dict[str, set]:
+    """Build (or return) the metadata term -> doc-id index."""
+    global _INV_INDEX
+    if _INV_INDEX is None or time.monotonic() - _INV_INDEX[0] >= _INV_INDEX_TTL:
+        index: Dict[str, set] = {}
+        async for meta in repo.list_meta(
+            projection=("id", "filename", "keywords", "topics", "metadata")
+        ):
+            terms = set()
+            for keyword in meta.keywords:
+                terms.update(_WORD_RE.findall(keyword.lower()))
+            for topic in meta.topics:
+                terms.update(_WORD_RE.findall(topic.lower()))
+            if meta.metadata.title:
+                terms.update(_WORD_RE.findall(meta.metadata.title.lower()))
+            for term in terms:
+                index.setdefault(term, set()).add(meta.id)
+        _INV_INDEX = (time.monotonic(), index)
+    return _INV_INDEX[1]
+
+
+def invalidate_search_cache() -> None:
+    """Drop cached search results; call when documents are added or removed."""
+    global _INV_INDEX
+    _SEARCH_CACHE.clear()
+    _INV_INDEX = None
+
+
+# Lazily lowered document text, keyed by (doc id, text length) as a cheap
+# change detector. Case-folding a multi-MB text allocates a fresh string, so
+# tools touching the same document in one agent trajectory reuse it.
+_TEXT_LOWER_CACHE: Dict[tuple, str] = {}
+
+
+def _text_lower(doc) -> str:
+    """Return doc.text.lower(), computed once per document."""
+    key = (doc.id, len(doc.text))
+    cached = _TEXT_LOWER_CACHE.get(key)
+    if cached is None:
+        cached = doc.text.lower()
+
+        # Keep the cache bounded; a full reset is cheap and rare
+        if len(_TEXT_LOWER_CACHE) >= 128:
+            _TEXT_LOWER_CACHE.clear()
+        _TEXT_LOWER_CACHE[key] = cached
+    return cached
+
+
+# Per-document tokenization cache shared by the tools below, keyed the same
+# way. Tools invoked on the same document skip re-tokenizing the text.
+_TOKEN_CACHE: Dict[tuple, tuple] = {}
+
+
+def _get_tokens(doc) -> tuple:
+    """Return (tokens, word_count, text_lower) for a document, cached."""
+    key = (doc.id, len(doc.text))
+    cached = _TOKEN_CACHE.get(key)
+    if cached is None:
+        text_lower = _text_lower(doc)
+        tokens = _WORD_RE.findall(text_lower)
+        cached = (tokens, len(tokens), text_lower)
+
+        # Keep the cache bounded; a full reset is cheap and rare
+        if len(_TOKEN_CACHE) >= 128:
+            _TOKEN_CACHE.clear()
+        _TOKEN_CACHE[key] = cached
+    return cached
+
+
+# Lowercased keyword/topic sets per document, cached by doc id so relevance
+# scoring can use O(1) membership tests instead of nested substring scans
+_META_CACHE: Dict[str, tuple] = {}
+
+
+def _get_meta_sets(doc) -> tuple:
+    """Return (keywords, topics) as lowercased frozensets, cached by doc id."""
+    cached = _META_CACHE.get(doc.id)
+    if cached is None:
+        cached = (
+            frozenset(keyword.lower() for keyword in doc.keywords),
+            frozenset(topic.lower() for topic in doc.topics),
+        )
+        if len(_META_CACHE) >= 256:
+            _META_CACHE.clear()
+        _META_CACHE[doc.id] = cached
+    return cached
+
+
+# Token-shingle similarity settings for compare_documents
+_SHINGLE_K = 5  # tokens per shingle
+_SHINGLE_CACHE: Dict[str, frozenset] = {}
+
+
+def _shingle_set(doc) -> frozenset:
+    """Return the hashed k-token shingle set for a document, cached by doc id.
+
+    Shingles are hashed to ints so the cached sets stay small regardless of
+    document size; repeated comparisons of the same document skip the scan.
+    """
+    cached = _SHINGLE_CACHE.get(doc.id)
+    if cached is not None:
+        return cached
+
+    tokens, _, _ = _get_tokens(doc)
+    if len(tokens) < _SHINGLE_K:
+        shingles = frozenset({hash(tuple(tokens))}) if tokens else frozenset()
+    else:
+        shingles = frozenset(
+            hash(tuple(tokens[i : i + _SHINGLE_K]))
+            for i in range(len(tokens) - _SHINGLE_K + 1)
+        )
+
+    # Keep the cache bounded; a full reset is cheap and rare
+    if len(_SHINGLE_CACHE) >= 128:
+        _SHINGLE_CACHE.clear()
+    _SHINGLE_CACHE[doc.id] = shingles
+    return shingles
+
+
+@lru_cache(maxsize=1)
+def _get_repo():
+    """Return the shared document repository instance for all tools."""
+    return get_database()
+
+
+# How much text get_document returns before pointing at get_document_chunk.
+# Keeps multi-MB documents out of the agent transcript; the model can read
+# further ranges on demand.
+_DOC_PREVIEW_CHARS = 4000
+
+
+# Worker pool for CPU-bound text analysis; processes are spawned lazily on
+# first use so importing this module stays cheap
+_STATS_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+# Path to the CV file served by the about_leslie tool
+_CV_PATH = os.path.join(os.path.dirname(__file__), "cv_data", "cv.json")
+
+# Common stop words excluded from the most-common-word statistics
+STOP_WORDS = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "in",
+        "on",
+        "at",
+        "of",
+        "for",
+        "to",
+        "and",
+        "or",
+        "but",
+        "is",
+        "are",
+        "was",
+        "were",
+    }
+)
 
 
 class IngestInput(BaseModel):
@@ -49,6 +243,14 @@ class GetDocumentInput(BaseModel):
     doc_id: str = Field(description="Document ID to retrieve")
 
 
+class GetDocumentChunkInput(BaseModel):
+    """Input for the get_document_chunk tool."""
+
+    doc_id: str = Field(description="Document ID to read from")
+    offset: int = Field(default=0, description="Character offset to start reading from")
+    length: int = Field(default=4000, description="Number of characters to return")
+
+
 class DocumentStatsInput(BaseModel):
     """Input for the document_stats tool."""
 
@@ -86,11 +288,13 @@ async def list_docs() -> List[Dict[str, Any]]:
         List of document metadata including document IDs, which are needed for other tools.
     """
     try:
-        repo = get_database()
+        repo = _get_repo()
         docs = []
 
-        # Process documents from list_meta()
-        async for doc in repo.list_meta():
+        # Process documents from list_meta(), fetching only the listed fields
+        async for doc in repo.list_meta(
+            projection=("id", "filename", "keywords", "topics", "summary", "metadata")
+        ):
             # Convert to dict representation for the agent
             doc_dict = {
                 "id": doc.id,
@@ -130,13 +334,13 @@ async def get_topics(doc_id: str) -> List[str]:
         List of topics
     """
     try:
-        repo = get_database()
+        repo = _get_repo()
         doc = await repo.get(doc_id)
 
         if not doc:
             return [f"Error: Document with ID {doc_id} not found"]
 
-        return doc.topics if hasattr(doc, "topics") else []
+        return getattr(doc, "topics", None) or []
     except Exception as e:
         return [f"Error getting topics: {str(e)}"]
 
@@ -145,19 +349,19 @@ async def get_topics(doc_id: str) -> List[str]:
 async def get_document(doc_id: str) -> Dict[str, Any]:
     """Retrieve a complete document by its ID.
 
-    ACTION GUIDE: Use when you need to see the FULL content of a specific document. Use this tool when the user asks for
-    "the complete text", "the entire document", "the full content" or wants to "read" a document. This tool returns
-    EVERYTHING including all content and metadata.
+    ACTION GUIDE: Use when you need to see the content of a specific document. Use this tool when the user asks for
+    "the complete text", "the entire document", "the full content" or wants to "read" a document. Returns all metadata
+    plus the first part of the text; if "content_truncated" is true, read further ranges with get_document_chunk.
     REQUIRED INPUT: doc_id - You MUST provide a valid document ID.
 
     Args:
         doc_id: Document ID
 
     Returns:
-        Complete document with all metadata and full text content
+        Document metadata with the first part of the text content
     """
     try:
-        repo = get_database()
+        repo = _get_repo()
         doc = await repo.get(doc_id)
 
         if not doc:
@@ -168,7 +372,9 @@ async def get_document(doc_id: str) -> Dict[str, Any]:
             "id": doc.id,
             "filename": doc.filename,
             "path": doc.path,
-            "content": doc.text,  # Full document text
+            "content": doc.text[:_DOC_PREVIEW_CHARS],
+            "content_total_chars": len(doc.text),
+            "content_truncated": len(doc.text) > _DOC_PREVIEW_CHARS,
             "keywords": doc.keywords,
             "topics": doc.topics,
             "summary": doc.summary or "",
@@ -196,6 +402,46 @@ async def get_document(doc_id: str) -> Dict[str, Any]:
         return {"error": f"Error retrieving document: {str(e)}"}
 
 
+@tool(args_schema=GetDocumentChunkInput)
+async def get_document_chunk(doc_id: str, offset: int = 0, length: int = 4000) -> Dict[str, Any]:
+    """Read a slice of a document's text content.
+
+    ACTION GUIDE: Use after get_document when a document was truncated ("content_truncated" is true)
+    and you need more of its text. Request only the ranges you need instead of the whole document.
+    REQUIRED INPUT: doc_id - You MUST provide a valid document ID.
+    OPTIONAL INPUT: offset/length - Character range to read (defaults: start of document, 4000 chars).
+
+    Args:
+        doc_id: Document ID
+        offset: Character offset to start reading from
+        length: Number of characters to return
+
+    Returns:
+        The requested text range with position info and whether more text remains
+    """
+    try:
+        repo = _get_repo()
+        doc = await repo.get(doc_id)
+
+        if not doc:
+            return {"error": f"Document with ID {doc_id} not found"}
+
+        offset = max(0, offset)
+        length = max(1, length)
+        chunk = doc.text[offset : offset + length]
+
+        return {
+            "id": doc.id,
+            "offset": offset,
+            "length": len(chunk),
+            "total_chars": len(doc.text),
+            "content": chunk,
+            "has_more": offset + len(chunk) < len(doc.text),
+        }
+    except Exception as e:
+        return {"error": f"Error retrieving document chunk: {str(e)}"}
+
+
 @tool(args_schema=DocumentStatsInput)
 async def document_stats(doc_id: str) -> Dict[str, Any]:
     """Get detailed statistics about a document.
@@ -211,94 +457,27 @@ async def document_stats(doc_id: str) -> Dict[str, Any]:
         Dictionary of document statistics
     """
     try:
-        repo = get_database()
+        repo = _get_repo()
         doc = await repo.get(doc_id)
 
         if not doc:
             return {"error": f"Document with ID {doc_id} not found"}
 
-        # Calculate basic statistics
-        text = doc.text
-        word_count = len(re.findall(r"\b\w+\b", text))
-        char_count = len(text)
-        sentence_count = len(re.findall(r"[.!?]+", text)) or 1  # Avoid division by zero
-        paragraph_count = len(re.split(r"\n\s*\n", text))
-
-        # Calculate advanced metrics
-        avg_word_length = char_count / max(1, word_count)
-        avg_sentence_length = word_count / max(1, sentence_count)
-        avg_paragraph_length = word_count / max(1, paragraph_count)
-
-        # Reading time estimation (average reading speed: 200-250 words per minute)
-        reading_time_minutes = word_count / 225
-
-        # Most common words (excluding stop words)
-        stop_words = {
-            "the",
-            "a",
-            "an",
-            "in",
-            "on",
-            "at",
-            "of",
-            "for",
-            "to",
-            "and",
-            "or",
-            "but",
-            "is",
-            "are",
-            "was",
-            "were",
-        }
-        words = re.findall(r"\b[a-z]{3,}\b", text.lower())
-        filtered_words = [word for word in words if word not in stop_words]
-        most_common_words = Counter(filtered_words).most_common(10)
-
-        # Complexity metrics
-        unique_words = len(set(words))
-        vocabulary_richness = unique_words / max(1, word_count)  # Type-token ratio
-
-        # Flesch Reading Ease score (rough approximation)
-        if sentence_count > 0 and word_count > 0:
-            flesch_score = (
-                206.835
-                - (1.015 * (word_count / sentence_count))
-                - (84.6 * (sum(len(word) for word in words) / word_count))
-            )
-        else:
-            flesch_score = 0
-
-        # Prepare statistics dictionary
-        stats = {
-            "basic_stats": {
-                "word_count": word_count,
-                "character_count": char_count,
-                "sentence_count": sentence_count,
-                "paragraph_count": paragraph_count,
-                "file_size_bytes": doc.metadata.size_bytes,
-            },
-            "readability": {
-                "average_word_length": round(avg_word_length, 2),
-                "average_sentence_length": round(avg_sentence_length, 2),
-                "average_paragraph_length": round(avg_paragraph_length, 2),
-                "estimated_reading_time_minutes": round(reading_time_minutes, 2),
-                "flesch_reading_ease": round(flesch_score, 2),
-            },
-            "vocabulary": {
-                "unique_word_count": unique_words,
-                "vocabulary_richness": round(vocabulary_richness, 4),
-                "most_common_words": most_common_words,
-            },
-            "metadata": {
-                "filename": doc.filename,
-                "mime_type": doc.metadata.mime,
-                "author": doc.metadata.author,
-                "title": doc.metadata.title,
-                "pages": doc.metadata.pages,
-                "created": doc.metadata.created.isoformat() if doc.metadata.created else None,
-                "modified": doc.metadata.modified.isoformat() if doc.metadata.modified else None,
-            },
+        # Run the CPU-heavy scan in the process pool so the event loop
+        # stays responsive while large texts are analyzed
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(_STATS_POOL, _compute_stats, doc.text)
+
+        # Attach the document metadata (cheap, needs the model objects)
+        stats["basic_stats"]["file_size_bytes"] = doc.metadata.size_bytes
+        stats["metadata"] = {
+            "filename": doc.filename,
+            "mime_type": doc.metadata.mime,
+            "author": doc.metadata.author,
+            "title": doc.metadata.title,
+            "pages": doc.metadata.pages,
+            "created": doc.metadata.created.isoformat() if doc.metadata.created else None,
+            "modified": doc.metadata.modified.isoformat() if doc.metadata.modified else None,
         }
 
         return stats
@@ -306,6 +485,74 @@ async def document_stats(doc_id: str) -> Dict[str, Any]:
         return {"error": f"Error analyzing document statistics: {str(e)}"}
 
 
+def _compute_stats(text: str) -> Dict[str, Any]:
+    """Pure-CPU portion of document_stats; safe to run in a worker process."""
+    # Calculate basic statistics (tokenize once over the lowered text)
+    words = _WORD_RE.findall(text.lower())
+    word_count = len(words)
+    char_count = len(text)
+    sentence_count = len(_SENT_RE.findall(text)) or 1  # Avoid division by zero
+    paragraph_count = len(_PARA_RE.split(text))
+
+    # Calculate advanced metrics
+    avg_word_length = char_count / max(1, word_count)
+    avg_sentence_length = word_count / max(1, sentence_count)
+    avg_paragraph_length = word_count / max(1, paragraph_count)
+
+    # Reading time estimation (average reading speed: 200-250 words per minute)
+    reading_time_minutes = word_count / 225
+
+    # One frequency table serves every vocabulary metric: top-10 filtered
+    # words, unique-word count, and total word length for Flesch. Iterating
+    # distinct words instead of every token avoids re-walking the text.
+    counts = Counter(words)
+    most_common_words = heapq.nlargest(
+        10,
+        (
+            (word, count)
+            for word, count in counts.items()
+            if len(word) >= 3 and word not in STOP_WORDS
+        ),
+        key=itemgetter(1),
+    )
+
+    # Complexity metrics
+    unique_words = len(counts)
+    vocabulary_richness = unique_words / max(1, word_count)  # Type-token ratio
+
+    # Flesch Reading Ease score (rough approximation)
+    if sentence_count > 0 and word_count > 0:
+        total_word_chars = sum(len(word) * count for word, count in counts.items())
+        flesch_score = (
+            206.835
+            - (1.015 * (word_count / sentence_count))
+            - (84.6 * (total_word_chars / word_count))
+        )
+    else:
+        flesch_score = 0
+
+    return {
+        "basic_stats": {
+            "word_count": word_count,
+            "character_count": char_count,
+            "sentence_count": sentence_count,
+            "paragraph_count": paragraph_count,
+        },
+        "readability": {
+            "average_word_length": round(avg_word_length, 2),
+            "average_sentence_length": round(avg_sentence_length, 2),
+            "average_paragraph_length": round(avg_paragraph_length, 2),
+            "estimated_reading_time_minutes": round(reading_time_minutes, 2),
+            "flesch_reading_ease": round(flesch_score, 2),
+        },
+        "vocabulary": {
+            "unique_word_count": unique_words,
+            "vocabulary_richness": round(vocabulary_richness, 4),
+            "most_common_words": most_common_words,
+        },
+    }
+
+
 @tool(args_schema=CompareDocumentsInput)
 async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
     """Compare two documents and identify similarities and differences.
@@ -321,9 +568,9 @@ async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
         Comparison results including similarities, differences, and unique content
     """
     try:
-        repo = get_database()
-        doc1 = await repo.get(doc_id_1)
-        doc2 = await repo.get(doc_id_2)
+        repo = _get_repo()
+        # Fetch both documents concurrently; the lookups are independent
+        doc1, doc2 = await asyncio.gather(repo.get(doc_id_1), repo.get(doc_id_2))
 
         if not doc1:
             return {"error": f"Document with ID {doc_id_1} not found"}
@@ -335,7 +582,7 @@ async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
             "id": doc1.id,
             "filename": doc1.filename,
             "size_bytes": doc1.metadata.size_bytes,
-            "word_count": len(re.findall(r"\b\w+\b", doc1.text)),
+            "word_count": _get_tokens(doc1)[1],
             "topics": doc1.topics,
             "keywords": doc1.keywords,
         }
@@ -344,7 +591,7 @@ async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
             "id": doc2.id,
             "filename": doc2.filename,
             "size_bytes": doc2.metadata.size_bytes,
-            "word_count": len(re.findall(r"\b\w+\b", doc2.text)),
+            "word_count": _get_tokens(doc2)[1],
             "topics": doc2.topics,
             "keywords": doc2.keywords,
         }
@@ -364,13 +611,13 @@ async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
         unique_keywords_doc1 = list(set(doc1.keywords) - set(doc2.keywords))
         unique_keywords_doc2 = list(set(doc2.keywords) - set(doc1.keywords))
 
-        # Text similarity (simple approach using common sentences)
-        doc1_sentences = set(re.split(r"[.!?]+", doc1.text))
-        doc2_sentences = set(re.split(r"[.!?]+", doc2.text))
-        common_sentences = doc1_sentences & doc2_sentences
-        similarity_ratio = len(common_sentences) / max(
-            1, (len(doc1_sentences) + len(doc2_sentences)) / 2
-        )
+        # Text similarity: Jaccard over hashed token shingles, which is robust
+        # to whitespace/case differences and O(1) per shingle in memory
+        doc1_shingles = _shingle_set(doc1)
+        doc2_shingles = _shingle_set(doc2)
+        common_shingles = doc1_shingles & doc2_shingles
+        union_size = len(doc1_shingles) + len(doc2_shingles) - len(common_shingles)
+        similarity_ratio = len(common_shingles) / union_size if union_size else 0.0
 
         # Compile results
         comparison = {
@@ -384,7 +631,7 @@ async def compare_documents(doc_id_1: str, doc_id_2: str) -> Dict[str, Any]:
                 "shared_keywords": shared_keywords,
                 "unique_keywords_doc1": unique_keywords_doc1,
                 "unique_keywords_doc2": unique_keywords_doc2,
-                "common_sentences_count": len(common_sentences),
+                "common_shingle_count": len(common_shingles),
             },
         }
 
@@ -413,76 +660,105 @@ async def search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
         if not query or len(query.strip()) == 0:
             return [{"error": "Search query cannot be empty"}]
 
-        repo = get_database()
+        # Serve repeated queries from the cache while it is fresh
+        cache_key = (query.strip().lower(), limit)
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[0] < _SEARCH_CACHE_TTL:
+            _SEARCH_CACHE.move_to_end(cache_key)
+            return cached[1]
+
+        repo = _get_repo()
         search_results = []
 
-        # Get all documents
-        documents = []
-        async for doc in repo.list_meta():
-            # Get the full document for searching
-            full_doc = await repo.get(doc.id)
-            if full_doc:
-                documents.append(full_doc)
-
-        # Simple relevance scoring
-        def calculate_relevance(doc, query):
-            # Count occurrences of query terms in document text
-            query_terms = re.findall(r"\b\w+\b", query.lower())
-            text_lower = doc.text.lower()
+        query_lower = query.lower()
+        query_terms = _WORD_RE.findall(query_lower)
+
+        # Pre-filter candidates with the metadata inverted index so only
+        # matching documents are fetched and scored; fall back to the full
+        # corpus when no metadata term matches (the body may still match)
+        index = await _get_inverted_index(repo)
+        candidate_ids: set = set()
+        for term in query_terms:
+            candidate_ids |= index.get(term, set())
+
+        if candidate_ids:
+            doc_ids = list(candidate_ids)
+        else:
+            doc_ids = [
+                meta.id
+                async for meta in repo.list_meta(projection=("id", "filename", "metadata"))
+            ]
+
+        # Fetch the full documents concurrently; concurrency is bounded so a
+        # large candidate set doesn't overload the DB.
+        semaphore = asyncio.Semaphore(10)
+
+        async def fetch_doc(doc_id: str):
+            async with semaphore:
+                return await repo.get(doc_id)
+
+        fetched = await asyncio.gather(*(fetch_doc(doc_id) for doc_id in doc_ids))
+        documents = [doc for doc in fetched if doc]
+
+        # Simple relevance scoring: a single tokenization pass per document
+        # yields the frequency of every query term at once, instead of one
+        # full text scan per term
+        def calculate_relevance(doc):
+            tokens, word_count, text_lower = _get_tokens(doc)
             title_lower = (doc.metadata.title or "").lower()
 
             # Boost scores for exact phrase match
-            exact_phrase_matches = text_lower.count(query.lower()) * 3
+            exact_phrase_matches = text_lower.count(query_lower) * 3
 
-            # Count term occurrences (with higher weight for title matches)
-            term_scores = sum(text_lower.count(term) for term in query_terms)
-            title_scores = sum(title_lower.count(term) for term in query_terms) * 2
+            # Count term occurrences from the shared frequency tables
+            # (with higher weight for title matches)
+            token_counts = Counter(tokens)
+            title_counts = Counter(_WORD_RE.findall(title_lower))
+            term_scores = sum(token_counts[term] for term in query_terms)
+            title_scores = sum(title_counts[term] for term in query_terms) * 2
 
             # Check if query terms appear in keywords or topics
-            keyword_topic_matches = sum(
-                1 for term in query_terms if any(term in kw.lower() for kw in doc.keywords)
-            )
-            keyword_topic_matches += sum(
-                1 for term in query_terms if any(term in topic.lower() for topic in doc.topics)
-            )
+            keywords_lower, topics_lower = _get_meta_sets(doc)
+            keyword_topic_matches = sum(term in keywords_lower for term in query_terms)
+            keyword_topic_matches += sum(term in topics_lower for term in query_terms)
             keyword_topic_matches *= 1.5  # Higher weight for metadata matches
 
             # Combine scores
             score = term_scores + title_scores + exact_phrase_matches + keyword_topic_matches
 
             # Normalize by document length
-            word_count = len(re.findall(r"\b\w+\b", doc.text))
             if word_count > 0:
                 score = score / (word_count**0.5)  # Using square root for softer normalization
 
             return score
 
-        # Calculate relevance for each document
-        scored_docs = []
-        for doc in documents:
-            relevance = calculate_relevance(doc, query)
-            if relevance > 0:  # Only include documents with some relevance
-                scored_docs.append((doc, relevance))
+        # Keep only the top `limit` documents with some relevance;
+        # O(N log k) with a running heap instead of sorting the full list
+        scored = ((doc, calculate_relevance(doc)) for doc in documents)
+        top_docs = heapq.nlargest(
+            limit, (pair for pair in scored if pair[1] > 0), key=itemgetter(1)
+        )
 
-        # Sort by relevance score (descending)
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
+        # One alternation pattern finds any query term in a single scan per
+        # doc; reuses the query_terms tokenized once at the top of the tool
+        snippet_re = None
+        if query_terms:
+            snippet_re = re.compile(
+                r"\b(" + "|".join(re.escape(term) for term in query_terms) + r")\b",
+                re.IGNORECASE,
+            )
 
-        # Take top results up to limit
-        for doc, score in scored_docs[:limit]:
-            # Create snippet with context around query terms
+        # Build the result entries for the top documents
+        for doc, score in top_docs:
+            # Create snippet with context around the first matching query term
             snippet = ""
-            query_terms = re.findall(r"\b\w+\b", query.lower())
-
-            # Find a relevant excerpt
-            for term in query_terms:
-                match = re.search(f"\\b{re.escape(term)}\\b", doc.text, re.IGNORECASE)
-                if match:
-                    start = max(0, match.start() - 50)
-                    end = min(len(doc.text), match.end() + 50)
-                    context = doc.text[start:end].strip()
-                    if context:
-                        snippet = f"...{context}..."
-                        break
+            match = snippet_re.search(doc.text) if snippet_re else None
+            if match:
+                start = max(0, match.start() - 50)
+                end = min(len(doc.text), match.end() + 50)
+                context = doc.text[start:end].strip()
+                if context:
+                    snippet = f"...{context}..."
 
             if not snippet and doc.text:
                 # Fallback to first part of the document
@@ -504,6 +780,11 @@ async def search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
         if not search_results:
             return [{"message": f"No documents found matching query: '{query}'"}]
 
+        # Store in the cache, evicting the oldest entry when full
+        _SEARCH_CACHE[cache_key] = (time.monotonic(), search_results)
+        if len(_SEARCH_CACHE) > _SEARCH_CACHE_MAX:
+            _SEARCH_CACHE.popitem(last=False)
+
         return search_results
     except Exception as e:
         return [{"error": f"Error searching documents: {str(e)}"}]
@@ -520,19 +801,20 @@ def about_leslie() -> Dict[str, Any]:
         Dict[str, Any]: A dictionary containing Leslie's information from the CV file.
         If an error occurs, returns a dictionary with an 'error' key explaining the issue.
     """
-    # read json file with Leslie's info from cv_data/cv.json
     try:
-        import json
-
-        cv_path = os.path.join(os.path.dirname(__file__), "cv_data", "cv.json")
-        with open(cv_path, "r") as f:
-            leslie_info = json.load(f)
-
-        return leslie_info
+        # Copy so callers can't mutate the cached dict
+        return dict(_load_cv())
     except Exception as e:
         return {"error": f"Error retrieving Leslie's information: {str(e)}"}
 
 
+@lru_cache(maxsize=1)
+def _load_cv() -> Dict[str, Any]:
+    """Load Leslie's CV from cv_data/cv.json once and cache the result."""
+    with open(_CV_PATH, "r") as f:
+        return json.load(f)
+
+
 @tool(args_schema=UserHistoryInput)
 async def get_user_history(user_id: str) -> List[Dict[str, Any]]:
     """Retrieve the Q&A history for a specific user.
@@ -548,7 +830,7 @@ async def get_user_history(user_id: str) -> List[Dict[str, Any]]:
         List of Q&A pairs from the user's history, or error if user not found
     """
     try:
-        user_service = UserDbHandler()
+        user_service = get_user_service()
         history = await user_service.get_user_history(user_id)
 
         if history is None:
@@ -558,15 +840,13 @@ async def get_user_history(user_id: str) -> List[Dict[str, Any]]:
             return [{"message": f"No history found for user {user_id}"}]
 
         # Convert QA objects to dictionaries for the agent
-        history_dicts = []
-        for qa in history:
-            qa_dict = {
+        return [
+            {
                 "question": qa.question,
                 "answer": qa.answer,
                 "timestamp": qa.timestamp.isoformat(),
             }
-            history_dicts.append(qa_dict)
-
-        return history_dicts
+            for qa in history
+        ]
     except Exception as e:
         return [{"error": f"Error retrieving user history: {str(e)}"}]
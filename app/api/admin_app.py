@@ -7,12 +7,32 @@ functionality for user management. It should not be exposed to end users.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.router_users import router as users_router
 from app.core.config import get_settings
+from app.db.mongo.connection import ensure_indexes
+from app.db.user_handler import get_user_service
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How often the expired-token sweep runs
+TOKEN_CLEANUP_INTERVAL_S = 3600
+
+
+async def _cleanup_expired_tokens_loop():
+    """Periodically delete users whose access token has expired."""
+    user_service = get_user_service()
+    while True:
+        await asyncio.sleep(TOKEN_CLEANUP_INTERVAL_S)
+        try:
+            removed = await user_service.cleanup_expired_tokens()
+            if removed:
+                logger.info(f"Expired-token sweep removed {removed} users")
+        except Exception as e:
+            logger.error(f"Expired-token sweep failed: {e}")
+
 
 def create_admin_app() -> FastAPI:
     """Create and configure the Admin FastAPI application."""
@@ -25,6 +45,7 @@ def create_admin_app() -> FastAPI:
         debug=settings.debug,
         docs_url="/admin/docs",  # Custom docs path
         redoc_url="/admin/redoc",  # Custom redoc path
+        default_response_class=ORJSONResponse,
     )
 
     # Add CORS middleware (more restrictive for admin)
@@ -42,6 +63,20 @@ def create_admin_app() -> FastAPI:
     # Include admin routers
     app.include_router(users_router, prefix="/admin", tags=["user-management"])
 
+    @app.on_event("startup")
+    async def create_indexes():
+        # Index the fields behind the user email/token lookups so they
+        # never fall back to collection scans
+        await ensure_indexes()
+
+    @app.on_event("startup")
+    async def start_token_cleanup():
+        # One background sweep per process, instead of cleanup work on
+        # any request path
+        app.state.token_cleanup_task = asyncio.create_task(
+            _cleanup_expired_tokens_loop()
+        )
+
     @app.get("/")
     async def admin_root():
         return {
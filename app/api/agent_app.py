@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.router_agent import router as agent_router
+from app.agent.agent import get_agent
 from app.core.config import get_settings
+from app.db.mongo.connection import ensure_indexes
+from anyio import to_thread
+import asyncio
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +22,7 @@ def create_app() -> FastAPI:
         description="A minimal LLM-Document PoC with LangChain agent",
         version="0.1.0",
         debug=settings.debug,
+        default_response_class=ORJSONResponse,
     )
 
     # Add CORS middleware
@@ -30,6 +37,28 @@ def create_app() -> FastAPI:
     # Include routers
     app.include_router(agent_router, prefix="/agent", tags=["agent"])
 
+    @app.on_event("startup")
+    async def warm_agent():
+        # Build the lru_cached agent on a worker thread during startup so the
+        # first user request doesn't pay for agent construction
+        asyncio.get_running_loop().run_in_executor(None, get_agent)
+
+    @app.on_event("startup")
+    async def create_indexes():
+        # Index the fields behind the hot path/topic/keyword/token lookups
+        # so they never fall back to collection scans
+        await ensure_indexes()
+
+    @app.on_event("startup")
+    async def limit_threadpool():
+        # Handlers are pure async (pymongo-async, httpx, aiofiles); the threadpool
+        # only serves the occasional to_thread file write, so cap it well
+        # below anyio's 40-thread default to keep it from ballooning if a
+        # sync dependency ever sneaks in
+        to_thread.current_default_thread_limiter().total_tokens = min(
+            32, (os.cpu_count() or 1) * 4
+        )
+
     @app.get("/")
     async def root():
         return {"message": "LLM Document PoC API", "version": "0.1.0"}
@@ -0,0 +1,81 @@
+"""
+In-process TTL cache for authenticated users.
+
+Authentication hits MongoDB on every request even though tokens live for
+hours. This cache stores resolved users keyed by a hash of their token so
+the hot auth path becomes a dict lookup. Entries expire shortly before the
+token itself does and are invalidated on token refresh and user deletion.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from app.models.user_models import User
+
+# Cached entries: token hash -> (user, expiry on the monotonic clock)
+_CACHE: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+_LOCK = asyncio.Lock()
+
+_MAX_ENTRIES = 10_000
+_MAX_TTL = 300.0  # seconds; re-validate against the DB at least this often
+_EXPIRY_MARGIN = 30.0  # don't serve users whose token is about to expire
+
+
+def _hash_token(token: str) -> str:
+    """Hash the token so raw credentials are never held in memory."""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+async def get(token: str) -> Optional[User]:
+    """Return the cached user for a token, or None on miss or expiry."""
+    key = _hash_token(token)
+    async with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+
+        user, expires = entry
+        if time.monotonic() >= expires:
+            del _CACHE[key]
+            return None
+
+        _CACHE.move_to_end(key)
+        return user
+
+
+async def store(token: str, user: User) -> None:
+    """Cache an authenticated user until shortly before their token expires."""
+    token_ttl = (
+        user.access_token.expires_at - datetime.now(timezone.utc)
+    ).total_seconds() - _EXPIRY_MARGIN
+    ttl = min(_MAX_TTL, token_ttl)
+    if ttl <= 0:
+        return
+
+    key = _hash_token(token)
+    async with _LOCK:
+        _CACHE[key] = (user, time.monotonic() + ttl)
+        _CACHE.move_to_end(key)
+
+        # Bounded LRU eviction
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+async def invalidate_token(token: str) -> None:
+    """Drop the cache entry for a single token."""
+    key = _hash_token(token)
+    async with _LOCK:
+        _CACHE.pop(key, None)
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Drop every cache entry belonging to a user (e.g. on token refresh)."""
+    async with _LOCK:
+        stale = [key for key, (user, _) in _CACHE.items() if user.id == user_id]
+        for key in stale:
+            del _CACHE[key]
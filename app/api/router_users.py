@@ -2,18 +2,26 @@
 User management API router for administrative use.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import datetime
 import logging
+import orjson
 
 from app.models.user_models import User
 from app.db.user_handler import get_user_service
-from app.api.router_agent import get_current_user
+from app.api import auth_cache
+from app.api.router_agent import CurrentUser
 
 router = APIRouter(prefix="/users", tags=["user-management"])
 logger = logging.getLogger(__name__)
 
+# Bind the user-service singleton once at import; handlers hit this module
+# global several times per request, so skip the function call each time
+_user_service = get_user_service()
+
 
 class CreateUserRequest(BaseModel):
     """Request model for creating a new user."""
@@ -30,7 +38,7 @@ class CreateUserResponse(BaseModel):
     email: str
     name: str
     token: str
-    expires_at: str
+    expires_at: datetime
     message: str
 
 
@@ -44,15 +52,13 @@ class UpdateUserRequest(BaseModel):
 async def create_user(request: CreateUserRequest):
     """Create a new user account."""
     try:
-        user_service = get_user_service()
-
         # Check if user already exists
-        existing_user = await user_service.get_user_by_email(request.email)
+        existing_user = await _user_service.get_user_by_email(request.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="User with this email already exists")
 
         # Create new user
-        user = await user_service.create_user(
+        user = await _user_service.create_user(
             email=request.email,
             name=request.name,
             token_validity_hours=request.token_validity_hours,
@@ -65,7 +71,7 @@ async def create_user(request: CreateUserRequest):
             email=user.email,
             name=user.name,
             token=user.access_token.token,
-            expires_at=user.access_token.expires_at.isoformat(),
+            expires_at=user.access_token.expires_at,
             message="User created successfully",
         )
 
@@ -77,9 +83,20 @@ async def create_user(request: CreateUserRequest):
 
 
 @router.get("/me")
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(request: Request, current_user: CurrentUser):
     """Get current user's profile information."""
-    return {
+    # Weak ETag over everything the payload depends on; repeat clients get
+    # a bodyless 304 instead of a re-serialized profile
+    etag = (
+        f'W/"{current_user.id}-{int(current_user.updated_at.timestamp())}'
+        f'-{len(current_user.history)}"'
+    )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+
+    # Constant-shape payload: encode with orjson directly and skip
+    # FastAPI's jsonable_encoder walk (datetimes serialize in C)
+    return ORJSONResponse({
         "user_id": current_user.id,
         "email": current_user.email,
         "name": current_user.name,
@@ -88,24 +105,26 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
         "history_count": len(current_user.history),
         "created_at": current_user.created_at,
         "updated_at": current_user.updated_at,
-    }
+    }, headers={"ETag": etag})
 
 
 @router.put("/me")
 async def update_current_user(
-    request: UpdateUserRequest, current_user: User = Depends(get_current_user)
+    request: UpdateUserRequest, current_user: CurrentUser
 ):
     """Update current user's profile information."""
     try:
-        user_service = get_user_service()
-
-        updated_user = await user_service.update_user_info(
+        updated_user = await _user_service.update_user_info(
             user_id=current_user.id, name=request.name
         )
 
         if not updated_user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # Drop the cached user so GET /users/me reflects the new name
+        # immediately instead of after the cache TTL
+        await auth_cache.invalidate_user(current_user.id)
+
         logger.info(f"Updated user profile: {updated_user.email}")
 
         return {
@@ -127,20 +146,18 @@ async def update_current_user(
 
 @router.get("/me/history")
 async def get_current_user_history(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser,
     limit: int = Query(30, ge=1, le=30, description="Number of recent Q/A pairs to return"),
 ):
     """Get current user's Q/A history."""
     try:
-        user_service = get_user_service()
-        history = await user_service.get_user_history(current_user.id)
+        # The slice happens server-side ($slice projection), so only the
+        # requested entries leave the database
+        history = await _user_service.get_user_history(current_user.id, limit)
 
         if history is None:
             raise HTTPException(status_code=404, detail="User history not found")
 
-        # Return the most recent 'limit' items
-        recent_history = history[-limit:] if len(history) > limit else history
-
         return {
             "history": [
                 {
@@ -149,10 +166,10 @@ async def get_current_user_history(
                     "answer": qa.answer,
                     "timestamp": qa.timestamp,
                 }
-                for qa in recent_history
+                for qa in history
             ],
-            "total_count": len(history),
-            "returned_count": len(recent_history),
+            "total_count": len(current_user.history),
+            "returned_count": len(history),
         }
 
     except HTTPException:
@@ -164,19 +181,21 @@ async def get_current_user_history(
 
 @router.post("/me/refresh-token")
 async def refresh_current_user_token(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser,
     token_validity_hours: int = Query(
         24, ge=1, le=168, description="Token validity in hours (max 7 days)"
     ),
 ):
     """Refresh current user's access token."""
     try:
-        user_service = get_user_service()
-        updated_user = await user_service.refresh_token(current_user.id, token_validity_hours)
+        updated_user = await _user_service.refresh_token(current_user.id, token_validity_hours)
 
         if not updated_user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # The old token is no longer valid; drop it from the auth cache
+        await auth_cache.invalidate_user(current_user.id)
+
         logger.info(f"Refreshed token for user: {updated_user.email}")
 
         return {
@@ -194,15 +213,16 @@ async def refresh_current_user_token(
 
 
 @router.delete("/me")
-async def delete_current_user(current_user: User = Depends(get_current_user)):
+async def delete_current_user(current_user: CurrentUser):
     """Delete current user's account."""
     try:
-        user_service = get_user_service()
-        deleted = await user_service.delete_user(current_user.id)
+        deleted = await _user_service.delete_user(current_user.id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail="User not found")
 
+        await auth_cache.invalidate_user(current_user.id)
+
         logger.info(f"Deleted user account: {current_user.email}")
 
         return {"message": "User account deleted successfully"}
@@ -215,9 +235,11 @@ async def delete_current_user(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/validate-token")
-async def validate_token(current_user: User = Depends(get_current_user)):
+async def validate_token(current_user: CurrentUser):
     """Validate the provided token and return user information."""
-    return {
+    # Constant-shape payload: encode with orjson directly and skip
+    # FastAPI's jsonable_encoder walk (datetimes serialize in C)
+    return ORJSONResponse({
         "valid": True,
         "user": {
             "user_id": current_user.id,
@@ -226,7 +248,7 @@ async def validate_token(current_user: User = Depends(get_current_user)):
             "token_expires": current_user.access_token.expires_at,
         },
         "message": "Token is valid",
-    }
+    })
 
 
 # Admin-only endpoints (no authentication required since this is on admin server)
@@ -235,52 +257,61 @@ async def validate_token(current_user: User = Depends(get_current_user)):
 @router.get("/list")
 async def list_all_users(
     limit: int = Query(50, ge=1, le=100, description="Number of users to return"),
-    skip: int = Query(0, ge=0, description="Number of users to skip"),
+    before: Optional[datetime] = Query(
+        None, description="Return users created before this instant (keyset cursor)"
+    ),
 ):
-    """List all users (admin only endpoint)."""
-    try:
-        user_service = get_user_service()
-        users = await user_service.list_users(limit=limit, skip=skip)
-
-        logger.info(f"Admin requested user list: returned {len(users)} users")
-
-        return {
-            "users": [
+    """List all users (admin only endpoint).
+
+    Paginated by keyset: pass the previous page's next_before value to
+    fetch the following page.
+    """
+
+    # Stream the JSON array straight off the Mongo cursor: memory stays flat
+    # regardless of page size and the first byte goes out before the last
+    # user has even been fetched
+    async def gen():
+        count = 0
+        next_before = None
+        yield b'{"users":['
+        async for user in _user_service.iter_users(limit=limit, before=before):
+            if count:
+                yield b","
+            count += 1
+            next_before = user.created_at
+            yield orjson.dumps(
                 {
                     "user_id": user.id,
                     "email": user.email,
                     "name": user.name,
                     "token_valid": user.is_token_valid(),
                     "token_expires": user.access_token.expires_at,
-                    "history_count": len(user.history),
                     "created_at": user.created_at,
                     "updated_at": user.updated_at,
                 }
-                for user in users
-            ],
-            "count": len(users),
-            "limit": limit,
-            "skip": skip,
-        }
+            )
+        logger.info(f"Admin requested user list: streamed {count} users")
+        yield b"]," + orjson.dumps(
+            {"count": count, "limit": limit, "next_before": next_before}
+        )[1:]
 
-    except Exception as e:
-        logger.error(f"Error listing users: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error listing users: {str(e)}")
+    return StreamingResponse(gen(), media_type="application/json")
 
 
 @router.get("/{user_id}")
 async def get_user_by_id_admin(user_id: str):
     """Get any user by ID (admin only)."""
     try:
-        user_service = get_user_service()
-        user = await user_service.get_user_by_id(user_id)
+        user = await _user_service.get_user_by_id(user_id)
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         logger.info(f"Admin accessed user: {user.email}")
 
-        return {
+        # Constant-shape payload: encode with orjson directly and skip
+        # FastAPI's jsonable_encoder walk (datetimes serialize in C)
+        return ORJSONResponse({
             "user_id": user.id,
             "email": user.email,
             "name": user.name,
@@ -289,7 +320,7 @@ async def get_user_by_id_admin(user_id: str):
             "history_count": len(user.history),
             "created_at": user.created_at,
             "updated_at": user.updated_at,
-        }
+        })
 
     except HTTPException:
         raise
@@ -305,16 +336,14 @@ async def get_user_history_admin(
 ):
     """Get any user's Q/A history (admin only)."""
     try:
-        user_service = get_user_service()
-        history = await user_service.get_user_history(user_id)
+        # The slice happens server-side ($slice projection), so only the
+        # requested entries leave the database
+        history = await _user_service.get_user_history(user_id, limit)
 
         if history is None:
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Return the most recent 'limit' items
-        recent_history = history[-limit:] if len(history) > limit else history
-
-        logger.info(f"Admin accessed history for user {user_id}: {len(recent_history)} items")
+        logger.info(f"Admin accessed history for user {user_id}: {len(history)} items")
 
         return {
             "user_id": user_id,
@@ -325,10 +354,9 @@ async def get_user_history_admin(
                     "answer": qa.answer,
                     "timestamp": qa.timestamp,
                 }
-                for qa in recent_history
+                for qa in history
             ],
-            "total_count": len(history),
-            "returned_count": len(recent_history),
+            "returned_count": len(history),
         }
 
     except HTTPException:
@@ -342,19 +370,19 @@ async def get_user_history_admin(
 async def delete_user_admin(user_id: str):
     """Delete any user account (admin only)."""
     try:
-        user_service = get_user_service()
-
         # Get user info for logging before deletion
-        user = await user_service.get_user_by_id(user_id)
+        user = await _user_service.get_user_by_id(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Delete the user
-        deleted = await user_service.delete_user(user_id)
+        deleted = await _user_service.delete_user(user_id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail="User not found")
 
+        await auth_cache.invalidate_user(user_id)
+
         logger.warning(f"Admin deleted user account: {user.email} (ID: {user_id})")
 
         return {
@@ -378,12 +406,14 @@ async def refresh_user_token_admin(
 ):
     """Refresh any user's access token (admin only)."""
     try:
-        user_service = get_user_service()
-        updated_user = await user_service.refresh_token(user_id, token_validity_hours)
+        updated_user = await _user_service.refresh_token(user_id, token_validity_hours)
 
         if not updated_user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # The old token is no longer valid; drop it from the auth cache
+        await auth_cache.invalidate_user(user_id)
+
         logger.info(f"Admin refreshed token for user: {updated_user.email}")
 
         return {
@@ -406,8 +436,7 @@ async def refresh_user_token_admin(
 async def get_user_by_email_admin(email: str):
     """Get any user by email (admin only)."""
     try:
-        user_service = get_user_service()
-        user = await user_service.get_user_by_email(email)
+        user = await _user_service.get_user_by_email(email)
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -443,8 +472,7 @@ class AddQARequest(BaseModel):
 async def add_qa_to_user_admin(user_id: str, request: AddQARequest):
     """Add Q/A to any user's history (admin only)."""
     try:
-        user_service = get_user_service()
-        user = await user_service.add_qa_to_history(user_id, request.question, request.answer)
+        user = await _user_service.add_qa_to_history(user_id, request.question, request.answer)
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
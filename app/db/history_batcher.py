@@ -0,0 +1,94 @@
+"""
+Write-behind batching for user history entries.
+
+Q/A pairs enqueued by the API handlers are flushed to MongoDB in a single
+bulk_write every few milliseconds instead of one $push round-trip per
+request, so history logging costs roughly one network round-trip per
+batch rather than per call under load.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.db.factory import get_user_database
+from app.models.user_models import QA
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 100  # history entries flushed together
+MAX_WAIT_MS = 50  # how long to wait for stragglers before flushing
+
+# History is capped at the most recent 30 entries, matching add_qa_to_history
+HISTORY_CAP = 30
+
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def enqueue(user_id: str, question: str, answer: str) -> None:
+    """Queue a Q/A pair for the user's history.
+
+    The entry is timestamped now and written by the background flush loop;
+    callers return immediately without waiting on the database. The worker
+    is started lazily on first use so the module can be imported without a
+    running event loop.
+    """
+    global _queue, _worker
+    if _queue is None:
+        _queue = asyncio.Queue()
+    if _worker is None or _worker.done():
+        _worker = asyncio.get_running_loop().create_task(_run())
+
+    _queue.put_nowait((user_id, QA(question=question, answer=answer)))
+
+
+async def _collect_batch(queue: asyncio.Queue) -> List[Tuple[str, QA]]:
+    """Pop up to MAX_BATCH items, waiting at most MAX_WAIT_MS for more."""
+    batch = [await queue.get()]
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_WAIT_MS / 1000
+    while len(batch) < MAX_BATCH:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+    return batch
+
+
+async def _run():
+    """Background worker: flush queued history entries in bulk."""
+    # bulk_write is a MongoDB capability, so the flush loop talks to the
+    # Mongo repository's collection directly rather than going through the
+    # one-at-a-time repo interface
+    collection = get_user_database().collection
+
+    while True:
+        batch = await _collect_batch(_queue)
+        try:
+            ops = [
+                UpdateOne(
+                    {"_id": user_id},
+                    {
+                        "$push": {
+                            "history": {
+                                "$each": [qa.model_dump()],
+                                "$slice": -HISTORY_CAP,
+                            }
+                        },
+                        # server-side timestamp, matching add_qa_to_history
+                        "$currentDate": {"updated_at": True},
+                    },
+                )
+                for user_id, qa in batch
+            ]
+            await collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Error flushing history batch of {len(batch)}: {e}")
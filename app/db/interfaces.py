@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Optional, List
+from typing import AsyncIterator, Optional, List, Sequence, Tuple
 from datetime import datetime
 from app.models import ParsedDocument
 from app.models.user_models import User, UserCreate, UserUpdate, QA
@@ -11,15 +11,29 @@ class DocRepo(ABC):
     """
 
     @abstractmethod
-    async def upsert(self, doc: ParsedDocument) -> str:
+    async def upsert(self, doc: ParsedDocument) -> Tuple[str, bool]:
         """
-        Insert or replace a document.
+        Insert or replace a document atomically.
 
         Args:
             doc: The document to insert or update
 
         Returns:
-            The UUID hex ID of the document
+            The hex ID of the document and whether it was created
+            (True) rather than updated (False)
+        """
+        pass
+
+    @abstractmethod
+    async def bulk_upsert(self, docs: Sequence[ParsedDocument]) -> List[str]:
+        """
+        Insert or replace many documents in one batch.
+
+        Args:
+            docs: The documents to insert or update
+
+        Returns:
+            The hex IDs of the documents, in input order
         """
         pass
 
@@ -33,6 +47,19 @@ class DocRepo(ABC):
         """
         pass
 
+    @abstractmethod
+    async def delete_many(self, ids: Sequence[str]) -> int:
+        """
+        Hard-delete many document records in one batch.
+
+        Args:
+            ids: The IDs of the documents to delete
+
+        Returns:
+            The number of documents deleted
+        """
+        pass
+
     @abstractmethod
     async def delete_by_path(self, path: str) -> int:
         """
@@ -60,16 +87,39 @@ class DocRepo(ABC):
         pass
 
     @abstractmethod
-    async def list_meta(self) -> AsyncIterator[ParsedDocument]:
+    async def list_meta(
+        self, projection: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[ParsedDocument]:
         """
         Stream metadata-only documents.
 
+        Args:
+            projection: Optional field names to fetch; backends should ship
+                only those fields over the wire when provided.
+
         Returns:
             An async iterator yielding documents without text content,
             ordered by uploaded_at DESC
         """
         pass
 
+    @abstractmethod
+    async def list_meta_by_prefix(
+        self, prefix: str, projection: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[ParsedDocument]:
+        """
+        Stream metadata-only documents whose path starts with a prefix.
+
+        Args:
+            prefix: Path prefix to match (typically a directory)
+            projection: Optional field names to fetch; backends should ship
+                only those fields over the wire when provided.
+
+        Returns:
+            An async iterator yielding matching documents without text
+        """
+        pass
+
     @abstractmethod
     async def query(self, topic: str = None, keyword: str = None) -> AsyncIterator[ParsedDocument]:
         """
@@ -125,6 +175,17 @@ class DocRepo(ABC):
         """
         pass
 
+    @abstractmethod
+    async def update_metadata(self, doc_id: str, fields: dict) -> None:
+        """
+        Update metadata-level fields without touching the text body.
+
+        Args:
+            doc_id: The ID of the document
+            fields: Field names and values to set
+        """
+        pass
+
 
 class UserRepo(ABC):
     """
@@ -144,6 +205,19 @@ class UserRepo(ABC):
         """
         pass
 
+    @abstractmethod
+    async def bulk_create_users(self, users_data: Sequence["UserCreate"]) -> List["User"]:
+        """
+        Create many users in one batch.
+
+        Args:
+            users_data: The user data for creation
+
+        Returns:
+            The created users, in input order
+        """
+        pass
+
     @abstractmethod
     async def get_user(self, user_id: str) -> Optional["User"]:
         """
@@ -230,12 +304,15 @@ class UserRepo(ABC):
         pass
 
     @abstractmethod
-    async def get_user_history(self, user_id: str) -> Optional[List["QA"]]:
+    async def get_user_history(
+        self, user_id: str, limit: Optional[int] = None
+    ) -> Optional[List["QA"]]:
         """
         Get a user's Q/A history.
 
         Args:
             user_id: The ID of the user
+            limit: Optional number of most recent entries to return
 
         Returns:
             The user's history if found, None otherwise
@@ -269,15 +346,43 @@ class UserRepo(ABC):
         pass
 
     @abstractmethod
-    async def list_users(self, limit: int = 50, skip: int = 0) -> List["User"]:
+    async def cleanup_expired_tokens(self) -> int:
         """
-        List users with pagination.
+        Delete users whose access token has expired.
+
+        Returns:
+            Number of users deleted
+        """
+        pass
+
+    @abstractmethod
+    async def list_users(
+        self, limit: int = 50, before: Optional["datetime"] = None
+    ) -> List["User"]:
+        """
+        List users with keyset pagination.
 
         Args:
             limit: Maximum number of users to return
-            skip: Number of users to skip
+            before: Only return users created strictly before this instant
+
+        Returns:
+            List of users ordered by created_at DESC
+        """
+        pass
+
+    @abstractmethod
+    async def iter_users(
+        self, limit: int = 50, before: Optional["datetime"] = None
+    ) -> AsyncIterator["User"]:
+        """
+        Stream users with keyset pagination.
+
+        Args:
+            limit: Maximum number of users to yield
+            before: Only yield users created strictly before this instant
 
         Returns:
-            List of users
+            An async iterator yielding users one at a time
         """
         pass
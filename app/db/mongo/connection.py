@@ -4,13 +4,18 @@ MongoDB connection management.
 This module provides functions for establishing and closing MongoDB connections.
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import timezone
+
+from pymongo import AsyncMongoClient, IndexModel
 from app.core.config import get_settings
 
 # Global variables to store database connection
 _client = None
 _db = None
 
+# Set once ensure_indexes has completed, so app startups can call it freely
+_indexes_ensured = False
+
 
 def connect_to_mongo():
     """
@@ -23,13 +28,72 @@ def connect_to_mongo():
 
     settings = get_settings()
 
-    # Create client if it doesn't exist
+    # Create client if it doesn't exist. One client (and thus one
+    # connection pool) is shared by both repositories; the pool is sized
+    # explicitly so concurrent request bursts reuse warm connections
+    # instead of thrashing TCP handshakes
     if _client is None:
-        _client = AsyncIOMotorClient(settings.mongo_uri)
+        _client = AsyncMongoClient(
+            settings.mongo_uri,
+            # Decode every stored datetime as UTC-aware at the driver, so
+            # no Python-side timezone fixup pass is needed per document
+            tz_aware=True,
+            tzinfo=timezone.utc,
+            maxPoolSize=50,
+            minPoolSize=5,
+            maxIdleTimeMS=30000,
+            socketTimeoutMS=45000,
+            connectTimeoutMS=10000,
+            retryWrites=True,
+        )
         _db = _client[settings.mongo_db_name]
 
 
-def close_mongo_connection():
+async def ensure_indexes():
+    """
+    Create the indexes backing the hot lookups.
+
+    Without these, get_id_by_path/delete_by_path, query() on topics or
+    keywords, the uploaded_at sort in list_meta, and the user email/token
+    lookups all collection-scan. Safe to call on every startup;
+    create_indexes is a no-op for indexes that already exist.
+    """
+    global _indexes_ensured
+
+    if _indexes_ensured:
+        return
+
+    connect_to_mongo()
+
+    await _db["docs"].create_indexes(
+        [
+            IndexModel([("path", 1)]),
+            IndexModel([("topics", 1)]),
+            IndexModel([("keywords", 1)]),
+            IndexModel([("uploaded_at", -1)]),
+        ]
+    )
+    await _db["users"].create_indexes(
+        [
+            IndexModel([("email", 1)], unique=True),
+            # Token lookups filter on the fixed-size blake2b digest; the
+            # partial filter lets pre-digest documents coexist with the
+            # unique constraint
+            IndexModel(
+                [("access_token.token_hash", 1)],
+                unique=True,
+                partialFilterExpression={"access_token.token_hash": {"$exists": True}},
+            ),
+            IndexModel([("created_at", -1)]),
+            # Range-deleted by the expired-token sweep
+            IndexModel([("access_token.expires_at", 1)]),
+        ]
+    )
+
+    _indexes_ensured = True
+
+
+async def close_mongo_connection():
     """
     Close the MongoDB connection.
 
@@ -39,7 +103,7 @@ def close_mongo_connection():
     global _client, _db
 
     if _client is not None:
-        _client.close()
+        await _client.close()
         _client = None
         _db = None
 
@@ -49,7 +113,7 @@ def get_mongo_client():
     Get the current MongoDB client.
 
     Returns:
-        The current AsyncIOMotorClient instance or None if not connected
+        The current AsyncMongoClient instance or None if not connected
     """
     return _client
 
@@ -59,6 +123,6 @@ def get_mongo_db():
     Get the current MongoDB database.
 
     Returns:
-        The current AsyncIOMotorDatabase instance or None if not connected
+        The current AsyncDatabase instance or None if not connected
     """
     return _db
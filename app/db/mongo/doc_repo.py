@@ -2,61 +2,123 @@
 MongoDB implementation of the document repository.
 """
 
-import uuid
-from typing import AsyncIterator, Optional, Dict, Any
+import re
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple
 
-from app.models import ParsedDocument
+from bson import ObjectId
+from pydantic import TypeAdapter
+from pymongo import ReplaceOne
+
+from app.models import DocumentMetadata, ParsedDocument
 from app.db.interfaces import DocRepo
 from app.db.mongo.connection import get_mongo_db, connect_to_mongo, get_mongo_client
 
+# Ops per bulk_write call; keeps each message comfortably under the BSON
+# 16 MB wire limit
+BULK_CHUNK = 1000
+
+# Documents fetched per getMore when streaming cursors; larger batches
+# amortize the round-trips behind list_meta/query
+CURSOR_BATCH = 500
+
+# Compiled once at import; validate_python reuses the core-schema
+# validator instead of re-entering Pydantic's machinery per document
+_PARSED_DOC_VALIDATOR = TypeAdapter(ParsedDocument)
+
+
+def _construct_meta_doc(raw: Dict[str, Any]) -> ParsedDocument:
+    """Build a ParsedDocument from a trusted BSON doc without validation.
+
+    Cursor streams re-parse data this repo wrote itself, so the Pydantic
+    validation pass is pure overhead; model_construct skips it. Fields a
+    projection excluded but the model requires are backfilled.
+    """
+    raw["id"] = raw.pop("_id")
+    raw["text"] = ""
+    raw.setdefault("path", "")
+    metadata = raw.get("metadata")
+    if isinstance(metadata, dict):
+        raw["metadata"] = DocumentMetadata.model_construct(**metadata)
+    return ParsedDocument.model_construct(**raw)
+
 
 class MongoDocRepo(DocRepo):
     """MongoDB implementation of the DocRepo interface."""
 
     def __init__(self):
-        """Initialize MongoDB repository without establishing connection."""
+        """Initialize the repository and bind its collection handle once."""
         connect_to_mongo()
-        self.client = get_mongo_client
+        self.client = get_mongo_client()
         self.db = get_mongo_db()
-        self.collection = self.db["docs"]
-
-    def _ensure_connection(self):
-        """Ensure database connection is established."""
         if self.db is None:
-            self.db = get_mongo_db()
-            if self.db is None:
-                raise RuntimeError(
-                    "MongoDB connection not established. Call connect_to_mongo() first."
-                )
-            self.collection = self.db["docs"]
+            raise RuntimeError("MongoDB connection not established")
+        self.collection = self.db["docs"]
 
-    async def upsert(self, doc: ParsedDocument) -> str:
+    async def upsert(self, doc: ParsedDocument) -> Tuple[str, bool]:
         """
         Insert or replace a document.
 
+        The create-or-update happens atomically in one round trip, so
+        callers never need a separate exists() check first.
+
         Args:
             doc: The document to insert or update
 
         Returns:
-            The UUID hex ID of the document
+            The hex ID of the document and whether it was created
+            (True) rather than updated (False)
         """
-        self._ensure_connection()
 
-        # Generate new ID if none exists
+        # Generate new ID if none exists. ObjectId hex is 24 chars to
+        # uuid4's 32 (smaller _id index) and its timestamp prefix keeps
+        # inserts at the B-tree's right edge; the counter-based generator
+        # also avoids uuid4's per-call urandom read
         if not doc.id:
-            doc.id = uuid.uuid4().hex
+            doc.id = str(ObjectId())
 
         # Convert to dict for storage
         doc_dict = doc.model_dump()
 
         # Use the id as _id for MongoDB
-        doc_dict["_id"] = doc_dict.pop("id")
+        doc_id = doc_dict.pop("id")
+
+        # Upsert via $set so unchanged fields (notably the large text body)
+        # are no-ops in the oplog/journal instead of a full rewrite; the _id
+        # comes from the filter on insert
+        result = await self.collection.update_one(
+            {"_id": doc_id}, {"$set": doc_dict}, upsert=True
+        )
+
+        return doc_id, result.upserted_id is not None
 
-        # Upsert the document
-        await self.collection.replace_one({"_id": doc_dict["_id"]}, doc_dict, upsert=True)
+    async def bulk_upsert(self, docs: Sequence[ParsedDocument]) -> List[str]:
+        """
+        Insert or replace many documents in one batch.
+
+        One unordered bulk_write carries up to BULK_CHUNK replace ops per
+        round-trip instead of one round-trip per document.
+
+        Args:
+            docs: The documents to insert or update
+
+        Returns:
+            The hex IDs of the documents, in input order
+        """
 
-        # Return the document ID
-        return doc_dict["_id"]
+        ops = []
+        ids: List[str] = []
+        for doc in docs:
+            if not doc.id:
+                doc.id = str(ObjectId())
+            doc_dict = doc.model_dump()
+            doc_dict["_id"] = doc_dict.pop("id")
+            ops.append(ReplaceOne({"_id": doc_dict["_id"]}, doc_dict, upsert=True))
+            ids.append(doc_dict["_id"])
+
+        for start in range(0, len(ops), BULK_CHUNK):
+            await self.collection.bulk_write(ops[start:start + BULK_CHUNK], ordered=False)
+
+        return ids
 
     async def delete(self, doc_id: str) -> None:
         """
@@ -65,9 +127,23 @@ class MongoDocRepo(DocRepo):
         Args:
             doc_id: The ID of the document to delete
         """
-        self._ensure_connection()
         await self.collection.delete_one({"_id": doc_id})
 
+    async def delete_many(self, ids: Sequence[str]) -> int:
+        """
+        Hard-delete many document records in one round trip.
+
+        Args:
+            ids: The IDs of the documents to delete
+
+        Returns:
+            The number of documents deleted
+        """
+        if not ids:
+            return 0
+        result = await self.collection.delete_many({"_id": {"$in": list(ids)}})
+        return result.deleted_count
+
     async def delete_by_path(self, path: str) -> int:
         """
         Hard-delete all documents with the specified path.
@@ -78,7 +154,6 @@ class MongoDocRepo(DocRepo):
         Returns:
             The number of documents deleted
         """
-        self._ensure_connection()
         result = await self.collection.delete_many({"path": path})
         return result.deleted_count
 
@@ -92,7 +167,6 @@ class MongoDocRepo(DocRepo):
         Returns:
             The full document (including text) or None if not found
         """
-        self._ensure_connection()
         raw = await self.collection.find_one({"_id": doc_id})
 
         if not raw:
@@ -102,29 +176,74 @@ class MongoDocRepo(DocRepo):
         raw["id"] = raw.pop("_id")
 
         # Return parsed document
-        return ParsedDocument(**raw)
+        return _PARSED_DOC_VALIDATOR.validate_python(raw)
 
-    async def list_meta(self) -> AsyncIterator[ParsedDocument]:
+    async def list_meta(
+        self, projection: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[ParsedDocument]:
         """
         Stream metadata-only documents.
 
+        Args:
+            projection: Optional field names to fetch; when given, only those
+                fields are shipped over the wire. Defaults to every field
+                except the text body.
+
         Returns:
             An async iterator yielding documents without text content,
             ordered by uploaded_at DESC
         """
-        self._ensure_connection()
-        # Find all documents, exclude text, and sort by uploaded_at DESC
-        cursor = self.collection.find({}, {"text": 0}).sort("uploaded_at", -1)
+        if projection is not None:
+            # Inclusion projection: fetch only the requested fields
+            fields: Dict[str, int] = {
+                name: 1 for name in projection if name not in ("id", "text")
+            }
+            fields["_id"] = 1
+        else:
+            fields = {"text": 0}
+
+        # Find all documents and sort by uploaded_at DESC
+        cursor = (
+            self.collection.find({}, fields)
+            .sort("uploaded_at", -1)
+            .batch_size(CURSOR_BATCH)
+        )
 
         async for raw in cursor:
-            # Convert MongoDB _id to id for ParsedDocument
-            raw["id"] = raw.pop("_id")
+            yield _construct_meta_doc(raw)
 
-            # Add empty text field since it was excluded but is required by the model
-            raw["text"] = ""
+    async def list_meta_by_prefix(
+        self, prefix: str, projection: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[ParsedDocument]:
+        """
+        Stream metadata-only documents whose path starts with a prefix.
+
+        The anchored regex walks only the matching range of the path
+        index, so the scan is bounded by the documents under the prefix
+        rather than the whole collection.
+
+        Args:
+            prefix: Path prefix to match (typically a directory)
+            projection: Optional field names to fetch; when given, only
+                those fields are shipped over the wire
 
-            # Yield parsed document
-            yield ParsedDocument(**raw)
+        Returns:
+            An async iterator yielding matching documents without text
+        """
+        if projection is not None:
+            fields: Dict[str, int] = {
+                name: 1 for name in projection if name not in ("id", "text")
+            }
+            fields["_id"] = 1
+        else:
+            fields = {"text": 0}
+
+        cursor = self.collection.find(
+            {"path": {"$regex": f"^{re.escape(prefix)}"}}, fields
+        ).batch_size(CURSOR_BATCH)
+
+        async for raw in cursor:
+            yield _construct_meta_doc(raw)
 
     async def query(self, topic: str = None, keyword: str = None) -> AsyncIterator[ParsedDocument]:
         """
@@ -140,32 +259,26 @@ class MongoDocRepo(DocRepo):
         Raises:
             ValueError: If both topic and keyword are None
         """
-        self._ensure_connection()
         # Ensure at least one parameter is provided
         if topic is None and keyword is None:
             raise ValueError("At least one of topic or keyword must be provided")
 
-        # Build query based on provided parameters
-        query: Dict[str, Any] = {"$or": []}
-
-        if topic:
-            query["$or"].append({"topics": topic})
-
-        if keyword:
-            query["$or"].append({"keywords": keyword})
+        # Build query based on provided parameters. A single condition is
+        # issued directly — no $or wrapper for the planner to unpick — and
+        # only the two-parameter case pays for the indexed $or union
+        query: Dict[str, Any]
+        if topic and keyword:
+            query = {"$or": [{"topics": topic}, {"keywords": keyword}]}
+        elif topic:
+            query = {"topics": topic}
+        else:
+            query = {"keywords": keyword}
 
         # Find matching documents, exclude text
-        cursor = self.collection.find(query, {"text": 0})
+        cursor = self.collection.find(query, {"text": 0}).batch_size(CURSOR_BATCH)
 
         async for raw in cursor:
-            # Convert MongoDB _id to id for ParsedDocument
-            raw["id"] = raw.pop("_id")
-
-            # Add empty text field since it was excluded but is required by the model
-            raw["text"] = ""
-
-            # Yield parsed document
-            yield ParsedDocument(**raw)
+            yield _construct_meta_doc(raw)
 
     async def exists(self, doc_id: str) -> bool:
         """
@@ -177,9 +290,10 @@ class MongoDocRepo(DocRepo):
         Returns:
             True if the document exists, False otherwise
         """
-        self._ensure_connection()
-        count = await self.collection.count_documents({"_id": doc_id}, limit=1)
-        return count > 0
+        # A projected point read on the _id index is cheaper than spinning
+        # up count_documents' aggregation machinery for a yes/no answer
+        doc = await self.collection.find_one({"_id": doc_id}, projection={"_id": 1})
+        return doc is not None
 
     async def get_id_by_path(self, path: str) -> Optional[str]:
         """
@@ -191,7 +305,6 @@ class MongoDocRepo(DocRepo):
         Returns:
             The document ID if found, None otherwise
         """
-        self._ensure_connection()
         result = await self.collection.find_one({"path": path}, projection={"_id": 1})
         if result:
             return result["_id"]
@@ -206,9 +319,20 @@ class MongoDocRepo(DocRepo):
             length: The length of the summary
             summary: The summary text
         """
-        self._ensure_connection()
         # Set field name for summary
         field = f"summaries.{length}"
 
         # Update document with summary
         await self.collection.update_one({"_id": doc_id}, {"$set": {field: summary}})
+
+    async def update_metadata(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Update metadata-level fields without touching the text body.
+
+        Args:
+            doc_id: The ID of the document
+            fields: Field names and values to set (text is ignored)
+        """
+        fields = {k: v for k, v in fields.items() if k not in ("_id", "id", "text")}
+        if fields:
+            await self.collection.update_one({"_id": doc_id}, {"$set": fields})
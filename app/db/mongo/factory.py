@@ -2,29 +2,34 @@
 Factory functions for creating MongoDB repository instances.
 
 This module provides factory functions to create properly configured
-repository instances. This approach is better than singletons as it
-allows for better testing and dependency injection.
+repository instances. The repositories are stateless wrappers around the
+shared client, so each factory memoizes a single instance; tests can call
+cache_clear() to get a fresh one.
 """
 
+from functools import lru_cache
+
 from app.db.mongo.doc_repo import MongoDocRepo
 from app.db.mongo.user_repo import MongoUserRepo
 
 
+@lru_cache(maxsize=1)
 def create_doc_repo() -> MongoDocRepo:
     """
-    Create a new MongoDB document repository instance.
+    Get the MongoDB document repository instance.
 
     Returns:
-        A new instance of the MongoDB document repository.
+        The memoized MongoDB document repository.
     """
     return MongoDocRepo()
 
 
+@lru_cache(maxsize=1)
 def create_user_repo() -> MongoUserRepo:
     """
-    Create a new MongoDB user repository instance.
+    Get the MongoDB user repository instance.
 
     Returns:
-        A new instance of the MongoDB user repository.
+        The memoized MongoDB user repository.
     """
     return MongoUserRepo()
@@ -2,72 +2,71 @@
 MongoDB implementation of the user repository.
 """
 
-from typing import Optional, List
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, List, Sequence
 from datetime import datetime, timezone
 
+from pymongo import InsertOne, ReturnDocument
+
 from app.models.user_models import User, UserCreate, UserUpdate, QA, AccessToken
 from app.db.interfaces import UserRepo
 from app.db.mongo.connection import get_mongo_db, connect_to_mongo, get_mongo_client
 
+# Ops per bulk_write call; keeps each message comfortably under the BSON
+# 16 MB wire limit
+BULK_CHUNK = 1000
+
+
+# In-process TTL cache for token lookups: token -> (stored_at, User).
+# Repeated requests from the same user within the TTL skip the Mongo
+# round-trip entirely; expires_at on the cached value stays authoritative.
+_TOKEN_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_TOKEN_CACHE_MAX = 10_000
+_TOKEN_CACHE_TTL = 60.0
+_TOKEN_CACHE_LOCK = asyncio.Lock()
+
+
+def _construct_user(doc: dict) -> User:
+    """Build a User from a trusted Mongo document without re-validation.
+
+    Every stored user was validated on the way in and the driver decodes
+    datetimes tz-aware, so reads skip pydantic-core via model_construct,
+    mirroring _construct_meta_doc in the doc repo. Sub-documents are
+    constructed explicitly and fields a projection excluded (history on
+    most paths) are backfilled with their defaults.
+    """
+    doc["id"] = doc.pop("_id")
+    token = doc.get("access_token")
+    if isinstance(token, dict):
+        token.pop("token_hash", None)  # storage-only lookup digest
+        doc["access_token"] = AccessToken.model_construct(**token)
+    doc["history"] = [QA.model_construct(**qa) for qa in doc.get("history") or []]
+    return User.model_construct(**doc)
+
+
+def _token_hash(token: str) -> str:
+    """Digest a token for the indexed access_token.token_hash field.
+
+    Lookups filter on this fixed-size digest (unique-indexed) rather than
+    the 200+ byte opaque token, keeping the index small and dense.
+    """
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 
 class MongoUserRepo(UserRepo):
     """MongoDB implementation of the UserRepo interface."""
 
     def __init__(self):
-        """Initialize MongoDB repository without establishing connection."""
+        """Initialize the repository and bind its collection handle once."""
         connect_to_mongo()
         self.client = get_mongo_client()
         self.db = get_mongo_db()
-        self.collection = self.db["users"]
-
-    def _ensure_timezone_aware(self, dt: datetime) -> datetime:
-        """Ensure a datetime object is timezone-aware (UTC)."""
-        if dt.tzinfo is None:
-            # If naive, assume it's UTC
-            return dt.replace(tzinfo=timezone.utc)
-        return dt
-
-    def _process_document_datetimes(self, doc: dict) -> dict:
-        """Process a MongoDB document to ensure all datetime fields are timezone-aware."""
-        datetime_fields = ["created_at", "updated_at"]
-
-        for field in datetime_fields:
-            if field in doc and isinstance(doc[field], datetime):
-                doc[field] = self._ensure_timezone_aware(doc[field])
-
-        # Process access_token datetime fields
-        if "access_token" in doc and isinstance(doc["access_token"], dict):
-            token_datetime_fields = ["expires_at", "created_at"]
-            for field in token_datetime_fields:
-                if field in doc["access_token"] and isinstance(
-                    doc["access_token"][field], datetime
-                ):
-                    doc["access_token"][field] = self._ensure_timezone_aware(
-                        doc["access_token"][field]
-                    )
-
-        # Process history QA timestamps
-        if "history" in doc and isinstance(doc["history"], list):
-            for qa in doc["history"]:
-                if (
-                    isinstance(qa, dict)
-                    and "timestamp" in qa
-                    and isinstance(qa["timestamp"], datetime)
-                ):
-                    qa["timestamp"] = self._ensure_timezone_aware(qa["timestamp"])
-
-        return doc
-
-    def _ensure_connection(self):
-        """Ensure database connection is established."""
         if self.db is None:
-            connect_to_mongo()
-            self.db = get_mongo_db()
-            if self.db is None:
-                raise RuntimeError(
-                    "MongoDB connection not established. Call connect_to_mongo() first."
-                )
-            self.collection = self.db["users"]
+            raise RuntimeError("MongoDB connection not established")
+        self.collection = self.db["users"]
 
     async def create_user(self, user_data: UserCreate) -> User:
         """
@@ -79,7 +78,6 @@ class MongoUserRepo(UserRepo):
         Returns:
             The created user
         """
-        self._ensure_connection()
         # Create access token
         access_token = AccessToken(token=user_data.token, expires_at=user_data.expires_at)
 
@@ -91,12 +89,48 @@ class MongoUserRepo(UserRepo):
         # Convert to dict for storage
         user_dict = user.model_dump()
         user_dict["_id"] = user_dict.pop("id")
+        user_dict["access_token"]["token_hash"] = _token_hash(user.access_token.token)
 
         # Insert the user
         await self.collection.insert_one(user_dict)
 
         return user
 
+    async def bulk_create_users(self, users_data: Sequence[UserCreate]) -> List[User]:
+        """
+        Create many users in one batch.
+
+        One unordered bulk_write carries up to BULK_CHUNK inserts per
+        round-trip instead of one insert_one per user.
+
+        Args:
+            users_data: The user data for creation
+
+        Returns:
+            The created users, in input order
+        """
+
+        users: List[User] = []
+        ops = []
+        for user_data in users_data:
+            access_token = AccessToken(token=user_data.token, expires_at=user_data.expires_at)
+            user = User(
+                email=user_data.email,
+                name=user_data.name,
+                access_token=access_token,
+                history=[],
+            )
+            user_dict = user.model_dump()
+            user_dict["_id"] = user_dict.pop("id")
+            user_dict["access_token"]["token_hash"] = _token_hash(user.access_token.token)
+            users.append(user)
+            ops.append(InsertOne(user_dict))
+
+        for start in range(0, len(ops), BULK_CHUNK):
+            await self.collection.bulk_write(ops[start:start + BULK_CHUNK], ordered=False)
+
+        return users
+
     async def get_user(self, user_id: str) -> Optional[User]:
         """
         Retrieve a user by ID.
@@ -107,12 +141,9 @@ class MongoUserRepo(UserRepo):
         Returns:
             The user if found, None otherwise
         """
-        self._ensure_connection()
         doc = await self.collection.find_one({"_id": user_id})
         if doc:
-            doc["id"] = doc.pop("_id")
-            doc = self._process_document_datetimes(doc)
-            return User(**doc)
+            return _construct_user(doc)
         return None
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
@@ -125,12 +156,9 @@ class MongoUserRepo(UserRepo):
         Returns:
             The user if found, None otherwise
         """
-        self._ensure_connection()
         doc = await self.collection.find_one({"email": email})
         if doc:
-            doc["id"] = doc.pop("_id")
-            doc = self._process_document_datetimes(doc)
-            return User(**doc)
+            return _construct_user(doc)
         return None
 
     async def get_user_by_token(self, token: str) -> Optional[User]:
@@ -143,14 +171,40 @@ class MongoUserRepo(UserRepo):
         Returns:
             The user if found, None otherwise
         """
-        self._ensure_connection()
-        doc = await self.collection.find_one({"access_token.token": token})
+
+        # Serve repeats from the in-process cache while the entry is fresh;
+        # the cached token's own expiry still applies via is_token_valid
+        async with _TOKEN_CACHE_LOCK:
+            entry = _TOKEN_CACHE.get(token)
+            if entry is not None:
+                stored_at, user = entry
+                if time.monotonic() - stored_at < _TOKEN_CACHE_TTL:
+                    return user
+                del _TOKEN_CACHE[token]
+
+        # Equality on the digest rides the unique token_hash index, whose
+        # fixed-size keys stay cache-resident regardless of token length
+        doc = await self.collection.find_one({"access_token.token_hash": _token_hash(token)})
         if doc:
-            doc["id"] = doc.pop("_id")
-            doc = self._process_document_datetimes(doc)
-            return User(**doc)
+            user = _construct_user(doc)
+            async with _TOKEN_CACHE_LOCK:
+                if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+                    _TOKEN_CACHE.popitem(last=False)
+                _TOKEN_CACHE[token] = (time.monotonic(), user)
+            return user
         return None
 
+    async def _invalidate_cached_user(self, user_id: str) -> None:
+        """Drop any cached token entries belonging to the given user."""
+        async with _TOKEN_CACHE_LOCK:
+            stale = [
+                token
+                for token, (_, user) in _TOKEN_CACHE.items()
+                if user.id == user_id
+            ]
+            for token in stale:
+                del _TOKEN_CACHE[token]
+
     async def update_user(self, user_id: str, user_data: UserUpdate) -> Optional[User]:
         """
         Update a user's information.
@@ -162,30 +216,38 @@ class MongoUserRepo(UserRepo):
         Returns:
             The updated user if found, None otherwise
         """
-        self._ensure_connection()
         update_dict = {}
 
+        # Pipeline-style update: $$NOW stamps created_at/updated_at with
+        # the server clock, so no client datetime ships over the wire.
+        # User-supplied strings are $literal-wrapped because pipeline
+        # values starting with "$" would otherwise resolve as field paths
         if user_data.name is not None:
-            update_dict["name"] = user_data.name
+            update_dict["name"] = {"$literal": user_data.name}
 
         if user_data.token is not None and user_data.expires_at is not None:
             update_dict["access_token"] = {
-                "token": user_data.token,
+                "token": {"$literal": user_data.token},
+                "token_hash": _token_hash(user_data.token),
                 "expires_at": user_data.expires_at,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": "$$NOW",
             }
 
         if update_dict:
-            update_dict["updated_at"] = datetime.now(timezone.utc)
+            update_dict["updated_at"] = "$$NOW"
 
+            # No caller of update_user reads history from the returned
+            # user, so leave the array out of the reply payload
             result = await self.collection.find_one_and_update(
-                {"_id": user_id}, {"$set": update_dict}, return_document=True
+                {"_id": user_id},
+                [{"$set": update_dict}],
+                projection={"history": 0},
+                return_document=ReturnDocument.AFTER,
             )
+            await self._invalidate_cached_user(user_id)
 
             if result:
-                result["id"] = result.pop("_id")
-                result = self._process_document_datetimes(result)
-                return User(**result)
+                return _construct_user(result)
 
         return None
 
@@ -201,24 +263,35 @@ class MongoUserRepo(UserRepo):
         Returns:
             The updated user if found, None otherwise
         """
-        self._ensure_connection()
-        update_dict = {
-            "access_token": {
-                "token": token,
-                "expires_at": expires_at,
-                "created_at": datetime.now(timezone.utc),
-            },
-            "updated_at": datetime.now(timezone.utc),
-        }
+        # Pipeline-style update so $$NOW stamps both timestamps with the
+        # server clock; the token is $literal-wrapped since pipeline
+        # strings starting with "$" would resolve as field paths
+        update_pipeline = [
+            {
+                "$set": {
+                    "access_token": {
+                        "token": {"$literal": token},
+                        "token_hash": _token_hash(token),
+                        "expires_at": expires_at,
+                        "created_at": "$$NOW",
+                    },
+                    "updated_at": "$$NOW",
+                }
+            }
+        ]
 
+        # Token refreshes only need the new token fields back, not the
+        # caller's Q/A history
         result = await self.collection.find_one_and_update(
-            {"_id": user_id}, {"$set": update_dict}, return_document=True
+            {"_id": user_id},
+            update_pipeline,
+            projection={"history": 0},
+            return_document=ReturnDocument.AFTER,
         )
+        await self._invalidate_cached_user(user_id)
 
         if result:
-            result["id"] = result.pop("_id")
-            result = self._process_document_datetimes(result)
-            return User(**result)
+            return _construct_user(result)
 
         return None
 
@@ -234,53 +307,49 @@ class MongoUserRepo(UserRepo):
         Returns:
             The updated user if found, None otherwise
         """
-        self._ensure_connection()
         # Create new QA object
         qa = QA(question=question, answer=answer)
 
-        # Get current user to check history length
-        user = await self.get_user(user_id)
-        if not user:
-            return None
-
-        # Add new QA to history
-        new_history = user.history + [qa]
-
-        # Keep only last 30 Q/A pairs
-        if len(new_history) > 30:
-            new_history = new_history[-30:]
-
-        # Convert history to dict format for storage
-        history_dicts = [qa_item.model_dump() for qa_item in new_history]
-
-        # Update the user
+        # Append server-side, keeping only the last 30 Q/A pairs: one atomic
+        # round-trip instead of read-modify-write, with no race between
+        # concurrent inserts
         result = await self.collection.find_one_and_update(
             {"_id": user_id},
-            {"$set": {"history": history_dicts, "updated_at": datetime.now(timezone.utc)}},
-            return_document=True,
+            {
+                "$push": {"history": {"$each": [qa.model_dump()], "$slice": -30}},
+                # $currentDate stamps updated_at server-side ($push rules
+                # out a pipeline update, so $$NOW isn't available here)
+                "$currentDate": {"updated_at": True},
+            },
+            return_document=ReturnDocument.AFTER,
         )
 
         if result:
-            result["id"] = result.pop("_id")
-            result = self._process_document_datetimes(result)
-            return User(**result)
+            return _construct_user(result)
 
         return None
 
-    async def get_user_history(self, user_id: str) -> Optional[List[QA]]:
+    async def get_user_history(
+        self, user_id: str, limit: Optional[int] = None
+    ) -> Optional[List[QA]]:
         """
         Get a user's Q/A history.
 
         Args:
             user_id: The ID of the user
+            limit: Optional number of most recent entries to return; when
+                given, the slice happens server-side via $slice so only
+                those entries travel over the wire
 
         Returns:
             The user's history if found, None otherwise
         """
-        user = await self.get_user(user_id)
-        if user:
-            return user.history
-        return None
+        projection = {"history": {"$slice": -limit}} if limit else {"history": 1}
+        doc = await self.collection.find_one({"_id": user_id}, projection)
+        if doc is None:
+            return None
+
+        return [QA.model_construct(**qa) for qa in doc.get("history") or []]
 
     async def delete_user(self, user_id: str) -> bool:
         """
@@ -292,8 +361,8 @@ class MongoUserRepo(UserRepo):
         Returns:
             True if user was deleted, False if not found
         """
-        self._ensure_connection()
         result = await self.collection.delete_one({"_id": user_id})
+        await self._invalidate_cached_user(user_id)
         return result.deleted_count > 0
 
     async def is_token_valid(self, token: str) -> bool:
@@ -306,29 +375,79 @@ class MongoUserRepo(UserRepo):
         Returns:
             True if token is valid, False otherwise
         """
-        user = await self.get_user_by_token(token)
-        if user:
-            return user.is_token_valid()
-        return False
+        # Project just the expiry: no point shipping the whole user doc
+        # (history included) and hydrating a model to compare one datetime
+        doc = await self.collection.find_one(
+            {"access_token.token_hash": _token_hash(token)},
+            projection={"access_token.expires_at": 1},
+        )
+        if not doc:
+            return False
+
+        return doc["access_token"]["expires_at"] > datetime.now(timezone.utc)
+
+    async def cleanup_expired_tokens(self) -> int:
+        """
+        Delete users whose access token has expired.
 
-    async def list_users(self, limit: int = 50, skip: int = 0) -> List[User]:
+        One indexed range delete does the whole sweep: O(expired users)
+        rather than a collection scan.
+
+        Returns:
+            Number of users deleted
         """
-        List users with pagination.
+        result = await self.collection.delete_many(
+            {"access_token.expires_at": {"$lt": datetime.now(timezone.utc)}}
+        )
+        return result.deleted_count
+
+    def _page_cursor(self, limit: int, before: Optional[datetime]):
+        """Build the keyset-paginated cursor shared by list/iter_users.
+
+        Filtering on created_at < before walks the created_at index from
+        the cursor position, unlike skip() which scans and discards skip
+        documents on every page. History is left out of the page payload.
+        """
+        query = {"created_at": {"$lt": before}} if before else {}
+        return (
+            self.collection.find(query, {"history": 0})
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+
+    async def list_users(self, limit: int = 50, before: Optional[datetime] = None) -> List[User]:
+        """
+        List users with keyset pagination.
 
         Args:
             limit: Maximum number of users to return
-            skip: Number of users to skip
+            before: Only return users created strictly before this instant;
+                pass the last user's created_at to fetch the next page
 
         Returns:
-            List of users
+            List of users ordered by created_at DESC, without history
         """
-        self._ensure_connection()
-        cursor = self.collection.find().skip(skip).limit(limit).sort("created_at", -1)
         users = []
-        
-        async for doc in cursor:
-            doc["id"] = doc.pop("_id")
-            doc = self._process_document_datetimes(doc)
-            users.append(User(**doc))
-        
+
+        async for doc in self._page_cursor(limit, before):
+            users.append(_construct_user(doc))
+
         return users
+
+    async def iter_users(
+        self, limit: int = 50, before: Optional[datetime] = None
+    ) -> AsyncIterator[User]:
+        """
+        Stream users with keyset pagination.
+
+        Args:
+            limit: Maximum number of users to yield
+            before: Only yield users created strictly before this instant
+
+        Returns:
+            An async iterator yielding users one at a time, ordered by
+            created_at DESC, without history
+        """
+
+        async for doc in self._page_cursor(limit, before):
+            yield _construct_user(doc)
@@ -4,7 +4,7 @@ User management service providing business logic for user operations.
 
 import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 
 from app.db.factory import get_user_database
 from app.models.user_models import User, UserCreate, UserUpdate, QA
@@ -108,17 +108,20 @@ class UserDbHandler:
         """
         return await self.repo.add_qa_to_history(user_id, question, answer)
 
-    async def get_user_history(self, user_id: str) -> Optional[List[QA]]:
+    async def get_user_history(
+        self, user_id: str, limit: Optional[int] = None
+    ) -> Optional[List[QA]]:
         """
         Get user's Q/A history.
 
         Args:
             user_id: The user's ID
+            limit: Optional number of most recent entries to return
 
         Returns:
             List of Q/A pairs, or None if user not found
         """
-        return await self.repo.get_user_history(user_id)
+        return await self.repo.get_user_history(user_id, limit)
 
     async def delete_user(self, user_id: str) -> bool:
         """
@@ -144,30 +147,43 @@ class UserDbHandler:
         """
         return await self.repo.is_token_valid(token)
 
-    async def list_users(self, limit: int = 50, skip: int = 0) -> List[User]:
+    async def list_users(self, limit: int = 50, before: Optional[datetime] = None) -> List[User]:
         """
-        List users with pagination.
+        List users with keyset pagination.
 
         Args:
             limit: Maximum number of users to return
-            skip: Number of users to skip
+            before: Only return users created strictly before this instant
 
         Returns:
-            List of users
+            List of users ordered by created_at DESC
         """
-        return await self.repo.list_users(limit, skip)
+        return await self.repo.list_users(limit, before)
+
+    async def iter_users(
+        self, limit: int = 50, before: Optional[datetime] = None
+    ) -> AsyncIterator[User]:
+        """
+        Stream users with keyset pagination, one at a time.
+
+        Args:
+            limit: Maximum number of users to yield
+            before: Only yield users created strictly before this instant
+
+        Returns:
+            An async iterator yielding users
+        """
+        async for user in self.repo.iter_users(limit, before):
+            yield user
 
     async def cleanup_expired_tokens(self) -> int:
         """
-        Clean up users with expired tokens (optional maintenance function).
-        This could be implemented as a background task.
+        Clean up users with expired tokens.
 
         Returns:
             Number of users cleaned up
         """
-        # This would require additional repository methods to find expired tokens
-        # For now, it's a placeholder for future implementation
-        pass
+        return await self.repo.cleanup_expired_tokens()
 
 
 # Create a singleton instance
@@ -3,9 +3,11 @@ Document loader module for parsing different file types.
 Provides both a DocumentLoader class and a convenience parse_file function.
 """
 
+import os
 from pathlib import Path
+from typing import Optional
 import logging
-from .parsers import get_parse_registry
+from .parsers import get_parse_registry, SUPPORTED_SUFFIXES_STR
 from app.models import ParsedDocument
 
 logger = logging.getLogger(__name__)
@@ -15,12 +17,14 @@ class DocumentLoader:
     """Handles loading and parsing of document files using appropriate parser."""
 
     @staticmethod
-    def parse_file(path: Path) -> ParsedDocument:
+    def parse_file(path: Path, stat_result: Optional[os.stat_result] = None) -> ParsedDocument:
         """
         Parse a file and return a ParsedDocument object containing text content and metadata.
 
         Args:
             path: Path to the file to parse
+            stat_result: Optional stat of the file, cached from a
+                directory scan, so the parser skips its own os.stat call
 
         Returns:
             ParsedDocument object containing extracted text content and metadata
@@ -30,26 +34,26 @@ class DocumentLoader:
         """
         suffix = path.suffix.lower()
 
-        registry = get_parse_registry()
-        if suffix not in registry:
-            supported_formats = ", ".join(registry.keys())
+        parser = get_parse_registry().get(suffix)
+        if parser is None:
             logger.warning(
-                f"Unsupported file type: {suffix}. Supported formats: {supported_formats}"
+                f"Unsupported file type: {suffix}. Supported formats: {SUPPORTED_SUFFIXES_STR}"
             )
             raise ValueError(f"Unsupported file type: {suffix}")
 
-        logger.info(f"Parsing file {path} using {registry[suffix].__class__.__name__}")
-        return registry[suffix].parse(path)
+        logger.info(f"Parsing file {path} using {parser.__class__.__name__}")
+        return parser.parse(path, stat_result)
 
 
 # Convenience function for backward compatibility
-def parse_file(path: Path) -> ParsedDocument:
+def parse_file(path: Path, stat_result: Optional[os.stat_result] = None) -> ParsedDocument:
     """
     Parse a file and return a ParsedDocument object.
     This is a convenience function that calls DocumentLoader.parse_file.
 
     Args:
         path: Path to the file to parse
+        stat_result: Optional stat of the file, cached from a directory scan
 
     Returns:
         ParsedDocument object containing extracted text content and metadata
@@ -57,4 +61,4 @@ def parse_file(path: Path) -> ParsedDocument:
     Raises:
         ValueError: If the file type is not supported
     """
-    return DocumentLoader.parse_file(path)
+    return DocumentLoader.parse_file(path, stat_result)
@@ -17,7 +17,15 @@ for m in pkgutil.iter_modules(__path__):
     except Exception as e:  # pragma: no cover
         log.warning("Parser %s failed to import: %s", m.name, e)
 
-# Import after dynamic imports to ensure all parsers are registered
+# Built once after registration: O(1) membership checks and a ready-made
+# string for error/log messages, instead of re-deriving both per file event
+SUPPORTED_SUFFIXES = frozenset(get_parse_registry())
+SUPPORTED_SUFFIXES_STR = ", ".join(sorted(SUPPORTED_SUFFIXES))
 
-
-__all__ = ["register", "BaseParser", "get_parse_registry"]
+__all__ = [
+    "register",
+    "BaseParser",
+    "get_parse_registry",
+    "SUPPORTED_SUFFIXES",
+    "SUPPORTED_SUFFIXES_STR",
+]
@@ -1,10 +1,16 @@
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
 from app.models import ParsedDocument
 
 REGISTRY: dict[str, "BaseParser"] = {}  # key = file suffix ".pdf"
 
+# Read-only view handed to callers; registration keeps writing to REGISTRY,
+# but nothing on the lookup path can mutate the mapping by accident
+_REGISTRY_VIEW = MappingProxyType(REGISTRY)
+
 
 def register(*suffixes: str) -> Callable[[type], type]:
     """
@@ -21,14 +27,18 @@ def register(*suffixes: str) -> Callable[[type], type]:
     return decorator
 
 
-def get_parse_registry() -> dict[str, "BaseParser"]:
-    return REGISTRY
+def get_parse_registry() -> Mapping[str, "BaseParser"]:
+    return _REGISTRY_VIEW
 
 
 class BaseParser(ABC):
     """Parse a file and return ParsedDocument object."""
 
     @abstractmethod
-    def parse(self, path: Path) -> ParsedDocument:
-        """Parse a file and return a ParsedDocument object."""
+    def parse(self, path: Path, stat_result: Optional[os.stat_result] = None) -> ParsedDocument:
+        """Parse a file and return a ParsedDocument object.
+
+        stat_result, when provided (e.g. cached from a directory scan),
+        spares the parser its own os.stat call for the size metadata.
+        """
         ...
@@ -1,34 +1,63 @@
 from pathlib import Path
+from typing import Optional
+from charset_normalizer import from_bytes
 from .base import BaseParser, register
 from app.models import ParsedDocument, DocumentMetadata
+import codecs
 import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Checked in order; the UTF-8 BOM is tested first since the UTF-16 LE
+# mark is a prefix of the UTF-32 LE one but not of UTF-8's. The matched
+# mark is sliced off before decoding — the endian-explicit utf-16-le/be
+# codecs would otherwise leave a spurious U+FEFF at the start of the text
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
 
 
 @register(".txt", ".csv", ".md", ".json")
 class TextParser(BaseParser):
     """Parser for plain text files including TXT, CSV, Markdown, and JSON."""
 
-    def parse(self, path: Path) -> ParsedDocument:
+    def parse(self, path: Path, stat_result: Optional[os.stat_result] = None) -> ParsedDocument:
         """Extract text and metadata from text-based files."""
-        # Attempt to read the file with different encodings
-        encodings = ["utf-8", "latin-1", "utf-16"]
-        text = None
+        # Read the raw bytes once; decoding attempts and the content hash
+        # both work from this buffer, so the file is never read twice and
+        # the text is never re-encoded just to hash it
+        raw = path.read_bytes()
 
-        for encoding in encodings:
-            try:
-                text = path.read_text(encoding=encoding)
+        # Pick the encoding: a BOM decides outright, plain UTF-8 is the
+        # fast path, and anything else goes through charset detection.
+        # The old utf-8 -> latin-1 -> utf-16 loop never reached utf-16
+        # (latin-1 decodes any byte string), so UTF-16 files got mojibake
+        text = None
+        for bom, encoding in _BOMS:
+            if raw.startswith(bom):
+                text = raw[len(bom):].decode(encoding)
                 break
-            except UnicodeDecodeError:
-                continue
 
         if text is None:
-            # If all encodings fail, use binary read and decode with errors ignored
-            text = path.read_bytes().decode("utf-8", errors="ignore")
+            try:
+                text = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                best = from_bytes(raw).best()
+                if best is not None:
+                    text = str(best)
+                else:
+                    # Undetectable binary-ish content: decode with errors ignored
+                    text = raw.decode("utf-8", errors="ignore")
 
-        print(f"Parsed {path.name} with {len(text)} characters")
+        logger.debug("Parsed %s with %d characters", path.name, len(text))
 
-        # Generate content hash ID
-        content_hash = hashlib.md5(text.encode()).hexdigest()
+        # Generate content hash ID over the raw bytes (blake2b beats md5
+        # on large documents; digest_size=16 keeps the 32-hex-char format)
+        content_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
 
         # Determine mime type based on file extension
         suffix = path.suffix.lower()
@@ -45,7 +74,10 @@ class TextParser(BaseParser):
 
         # Create document metadata
         document_metadata = DocumentMetadata(
-            filename=path.name, size_bytes=path.stat().st_size, mime=mime, lines=lines
+            filename=path.name,
+            size_bytes=(stat_result or path.stat()).st_size,
+            mime=mime,
+            lines=lines,
         )
 
         return ParsedDocument(
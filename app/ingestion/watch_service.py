@@ -49,7 +49,7 @@ class WatcherApp:
         logger.info("Stopping document watcher...")
 
         if self.watcher:
-            self.watcher.stop()
+            await self.watcher.stop()
 
         self.running = False
         logger.info("Document watcher stopped")
@@ -71,4 +71,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    # uvloop is already pulled in by uvicorn[standard]; install it here too
+    # so the standalone watcher gets the same faster event loop
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
@@ -25,6 +25,6 @@ class DocumentWatcher(ABC):
         pass
     
     @abstractmethod
-    def stop(self):
+    async def stop(self):
         """Stop watching the configured folder."""
         pass
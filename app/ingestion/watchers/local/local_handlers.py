@@ -3,17 +3,55 @@ from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from app.db import get_database
 from app.agent.llm_backend import get_llm_backend
+from app.agent import result_cache
+from app.agent.tools import invalidate_search_cache
 import asyncio
 import logging
+from collections import OrderedDict
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 import os
 from pathlib import Path
-from app.ingestion.parsers import get_parse_registry
+from app.ingestion.parsers import SUPPORTED_SUFFIXES, SUPPORTED_SUFFIXES_STR
 from app.ingestion.loader import parse_file
 
+import tiktoken
+
 logger = logging.getLogger(__name__)
 
+# How long a path must stay quiet before a modified burst is reprocessed
+DEBOUNCE_SECONDS = 0.5
+
+# Files processed in parallel during a directory scan; bounded so a bulk
+# drop can't exhaust LLM rate limits or the DB connection pool
+MAX_CONCURRENT_FILES = 16
+
+# Token budget for the extraction prompt's document content
+MAX_EXTRACT_TOKENS = 6000
+
+# Lazily built BPE encoder; cl100k_base approximates well enough across
+# the configurable backends
+_TOKEN_ENCODER = None
+
+
+def _truncate_to_token_budget(text: str) -> str:
+    """Cap text at MAX_EXTRACT_TOKENS model tokens.
+
+    A character slice measures the wrong unit: short-word prose wastes
+    budget while long-word/CJK content gets cut far below it.
+    """
+    global _TOKEN_ENCODER
+    if _TOKEN_ENCODER is None:
+        try:
+            _TOKEN_ENCODER = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        except KeyError:
+            _TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
+
+    tokens = _TOKEN_ENCODER.encode(text)
+    if len(tokens) <= MAX_EXTRACT_TOKENS:
+        return text
+    return _TOKEN_ENCODER.decode(tokens[:MAX_EXTRACT_TOKENS])
+
 
 class DocumentExtraction(BaseModel):
     """Schema for document extraction results."""
@@ -48,7 +86,7 @@ async def extract_document_info(file_content: str) -> DocumentExtraction:
     # Process the document
     result = await chain.ainvoke(
         {
-            "content": file_content[:8000],  # Limit content length for processing
+            "content": _truncate_to_token_budget(file_content),
             "format_instructions": parser.get_format_instructions(),
         }
     )
@@ -56,6 +94,103 @@ async def extract_document_info(file_content: str) -> DocumentExtraction:
     return result
 
 
+# Extraction results keyed by content hash: identical content (re-saved,
+# reverted, or duplicated under another path) reuses the previous answer
+# instead of paying another LLM round-trip
+_EXTRACTION_CACHE: "OrderedDict[str, DocumentExtraction]" = OrderedDict()
+_EXTRACTION_CACHE_MAX = 512
+
+# In-flight extractions by content hash, so concurrent events for the
+# same content join one LLM call rather than racing duplicates
+_EXTRACTION_TASKS: Dict[str, asyncio.Task] = {}
+
+
+async def extract_document_info_cached(content_hash: str, file_content: str) -> DocumentExtraction:
+    """Memoized extract_document_info keyed by the document content hash."""
+    cached = _EXTRACTION_CACHE.get(content_hash)
+    if cached is not None:
+        _EXTRACTION_CACHE.move_to_end(content_hash)
+        return cached
+
+    task = _EXTRACTION_TASKS.get(content_hash)
+    if task is None:
+        task = asyncio.ensure_future(extract_document_info(file_content))
+        _EXTRACTION_TASKS[content_hash] = task
+
+    try:
+        result = await task
+    finally:
+        _EXTRACTION_TASKS.pop(content_hash, None)
+
+    _EXTRACTION_CACHE[content_hash] = result
+    if len(_EXTRACTION_CACHE) > _EXTRACTION_CACHE_MAX:
+        _EXTRACTION_CACHE.popitem(last=False)
+    return result
+
+
+def _iter_files(root: str):
+    """Yield (path, stat_result) for every file under root via os.scandir.
+
+    scandir reuses the directory entry type from the OS, so the
+    file-vs-dir check costs no extra stat call the way os.walk's
+    listdir-based traversal can. The stat is taken here once and passed
+    down to the parsers, which would otherwise re-stat each file for its
+    size metadata.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        try:
+                            yield entry.path, entry.stat(follow_symlinks=False)
+                        except OSError:
+                            # Deleted between listing and stat; skip it
+                            continue
+        except OSError as e:
+            logger.warning(f"Cannot scan directory {current}: {e}")
+
+
+# Paths buffered between the scanning thread and the consuming coroutine;
+# bounds memory on huge trees and applies backpressure to the producer
+_SCAN_QUEUE_MAX = 256
+
+_SCAN_DONE = object()
+
+
+async def _aiter_files(root: str):
+    """Stream _iter_files results without blocking the event loop.
+
+    The scandir walk runs on a worker thread and hands paths over through
+    a bounded queue, so consumers start processing the first files while
+    deep trees are still being enumerated instead of waiting for the full
+    listing to materialize.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_SCAN_QUEUE_MAX)
+
+    def produce():
+        try:
+            for item in _iter_files(root):
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(_SCAN_DONE), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _SCAN_DONE:
+                break
+            yield item
+    finally:
+        await producer
+
+
 class DocumentHandler(FileSystemEventHandler):
     """Handler for file system events in the watch folder."""
 
@@ -63,6 +198,12 @@ class DocumentHandler(FileSystemEventHandler):
         super().__init__()
         # Keep track of the main event loop
         self.loop = None
+        # In-flight process_file tasks by path: watchdog fires created and
+        # modified back-to-back for the same file, and joiners should share
+        # one parse+LLM pass instead of racing a duplicate
+        self._inflight = {}
+        # Pending debounce timers by path for modified-event bursts
+        self._pending = {}
 
     def set_loop(self, loop):
         """Set the event loop to use for async operations."""
@@ -93,36 +234,74 @@ class DocumentHandler(FileSystemEventHandler):
             logger.error(f"Error running coroutine: {e}")
             return None
 
+    @staticmethod
+    def _is_supported(path: str) -> bool:
+        """Cheap suffix check applied before any event is dispatched.
+
+        Editor temp files (.swp, .tmp, .part) fire constant event noise;
+        rejecting them here keeps that noise off the event loop entirely.
+        """
+        return os.path.splitext(path)[1].lower() in SUPPORTED_SUFFIXES
+
     def on_created(self, event):
         """Handle file creation events."""
-        logger.info(f"Created: {event.src_path}")
         if event.is_directory:
+            logger.info(f"Created: {event.src_path}")
             # When a directory is created, process all files within it
             self._run_coroutine(self.process_directory(event.src_path))
-        else:
+        elif self._is_supported(event.src_path):
+            logger.info(f"Created: {event.src_path}")
             # For individual files, process as usual
             self._run_coroutine(self.process_file(event.src_path))
 
     def on_modified(self, event):
-        """Handle file modification events."""
+        """Handle file modification events.
+
+        Editors save in bursts (temp write, rename, chmod), each firing
+        its own modified event; a short per-path debounce window coalesces
+        the burst into a single reprocess.
+        """
+        if event.is_directory or not self._is_supported(event.src_path):
+            return
         logger.info(f"Modified: {event.src_path}")
-        if not event.is_directory:
+        if self.loop is not None and self.loop.is_running():
+            # This callback runs on watchdog's thread; timer bookkeeping
+            # has to happen on the loop thread
+            self.loop.call_soon_threadsafe(self._debounce_modified, event.src_path)
+        else:
             self._run_coroutine(self.process_file(event.src_path, force_update=True))
 
+    def _debounce_modified(self, file_path: str):
+        """(Re)arm the debounce timer for a path; runs on the loop thread."""
+        prior = self._pending.pop(file_path, None)
+        if prior is not None:
+            prior.cancel()
+        self._pending[file_path] = self.loop.call_later(
+            DEBOUNCE_SECONDS, self._fire_modified, file_path
+        )
+
+    def _fire_modified(self, file_path: str):
+        """Debounce window elapsed: reprocess the file once."""
+        self._pending.pop(file_path, None)
+        asyncio.ensure_future(self.process_file(file_path, force_update=True))
+
     def on_deleted(self, event):
         """Handle file deletion events."""
+        if event.is_directory or not self._is_supported(event.src_path):
+            return
         logger.info(f"Deleted: {event.src_path}")
-        if not event.is_directory:
-            self._run_coroutine(self.handle_deleted_file(event.src_path))
+        self._run_coroutine(self.handle_deleted_file(event.src_path))
 
     def on_moved(self, event):
         """Handle file move events."""
-        logger.info(f"Moved from {event.src_path} to {event.dest_path}")
         if event.is_directory:
+            logger.info(f"Moved from {event.src_path} to {event.dest_path}")
             # When a directory is moved, process all files in the new location
             self._run_coroutine(self.process_directory(event.dest_path))
-        else:
-            # For individual files, process as usual
+        elif self._is_supported(event.src_path) or self._is_supported(event.dest_path):
+            # Either side can matter: editors rename temp files into place
+            # (unsupported -> supported) and renames away need cleanup
+            logger.info(f"Moved from {event.src_path} to {event.dest_path}")
             self._run_coroutine(self.handle_moved_file(event.src_path, event.dest_path))
 
     async def process_directory(self, dir_path: str):
@@ -130,14 +309,31 @@ class DocumentHandler(FileSystemEventHandler):
         try:
             logger.info(f"Processing directory: {dir_path}")
             
-            # Collect all existing file paths in the directory
+            # Each file is disk + LLM latency, so fan out across a bounded
+            # number of concurrent tasks instead of awaiting sequentially;
+            # the per-path singleflight keeps watcher events from stomping
+            sem = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+
+            async def process_guarded(p: str, st: os.stat_result):
+                async with sem:
+                    await self.process_file(p, stat_result=st)
+
+            # Collect all existing file paths in the directory; tasks are
+            # scheduled as paths stream in, so the first parses overlap
+            # the rest of the enumeration
             existing_file_paths = set()
-            for root, _, files in os.walk(dir_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    existing_file_paths.add(file_path)
-                    # Process each file individually
-                    await self.process_file(file_path)
+            tasks = []
+            async for file_path, stat_result in _aiter_files(dir_path):
+                existing_file_paths.add(file_path)
+                # Unsupported suffixes are filtered here, before paying a
+                # DB lookup inside process_file
+                if os.path.splitext(file_path)[1].lower() in SUPPORTED_SUFFIXES:
+                    tasks.append(
+                        asyncio.ensure_future(process_guarded(file_path, stat_result))
+                    )
+
+            if tasks:
+                await asyncio.gather(*tasks)
             
             # After processing all files, clean up database entries for deleted files
             await self._cleanup_deleted_files_in_directory(dir_path, existing_file_paths)
@@ -152,18 +348,23 @@ class DocumentHandler(FileSystemEventHandler):
             
             db = get_database()
             deleted_count = 0
-            
-            # Get all documents from the database
-            async for doc in db.list_meta():
-                # Check if this document is within the processed directory
-                if doc.path and doc.path.startswith(dir_path):
-                    # If the file no longer exists in the directory, delete it from database
-                    if doc.path not in existing_file_paths:
-                        logger.info(f"Deleting orphaned document: {doc.id} (path: {doc.path})")
-                        await db.delete(doc.id)
-                        deleted_count += 1
+            to_delete = []
+
+            # Only walk documents under this directory (server-side prefix
+            # match on the path index), fetching just id and path
+            async for doc in db.list_meta_by_prefix(dir_path, projection=["path"]):
+                # If the file no longer exists in the directory, delete it from database
+                if doc.path not in existing_file_paths:
+                    logger.info(f"Deleting orphaned document: {doc.id} (path: {doc.path})")
+                    to_delete.append(doc.id)
+                    result_cache.invalidate(doc.id)
+
+            # One delete round-trip per ~500 orphans instead of one each
+            for start in range(0, len(to_delete), 500):
+                deleted_count += await db.delete_many(to_delete[start:start + 500])
             
             if deleted_count > 0:
+                invalidate_search_cache()
                 logger.info(f"Cleaned up {deleted_count} orphaned documents from directory: {dir_path}")
             else:
                 logger.info(f"No orphaned documents found in directory: {dir_path}")
@@ -171,8 +372,31 @@ class DocumentHandler(FileSystemEventHandler):
         except Exception as e:
             logger.error(f"Error cleaning up deleted files in directory {dir_path}: {e}")
 
-    async def process_file(self, file_path: str, force_update: bool = False):
-        """Process a new document file."""
+    async def process_file(
+        self,
+        file_path: str,
+        force_update: bool = False,
+        stat_result: Optional[os.stat_result] = None,
+    ):
+        """Process a new document file, deduping concurrent calls per path."""
+        existing = self._inflight.get(file_path)
+        if existing is not None:
+            return await existing
+
+        task = asyncio.ensure_future(self._process_file(file_path, force_update, stat_result))
+        self._inflight[file_path] = task
+        try:
+            return await task
+        finally:
+            self._inflight.pop(file_path, None)
+
+    async def _process_file(
+        self,
+        file_path: str,
+        force_update: bool = False,
+        stat_result: Optional[os.stat_result] = None,
+    ):
+        """Parse, extract and persist one document file."""
         try:
             db = get_database()
             # Get document ID by original file path
@@ -186,21 +410,22 @@ class DocumentHandler(FileSystemEventHandler):
                     return
 
             path = Path(file_path)
-            # Use the parser registry to check if file type is supported
-            registry = get_parse_registry()
-            if path.suffix.lower() not in registry:
-                supported_formats = ", ".join(registry.keys())
+            # Check support against the precomputed suffix set
+            if path.suffix.lower() not in SUPPORTED_SUFFIXES:
                 logger.info(
-                    f"Skipping unsupported file: {file_path} (supported: {supported_formats})"
+                    f"Skipping unsupported file: {file_path} "
+                    f"(supported: {SUPPORTED_SUFFIXES_STR})"
                 )
                 return
 
             logger.info(f"Processing new file: {file_path}")
 
-            # Parse the file content
-            document = parse_file(Path(file_path))
-            # Extract metadata and content using LLM agent
-            doc_info = await extract_document_info(document.text)
+            # Parse the file content, reusing the scan-time stat if one
+            # was captured
+            document = parse_file(Path(file_path), stat_result)
+            # Extract metadata and content using LLM agent; the document id
+            # is the content hash, so unchanged content hits the memo
+            doc_info = await extract_document_info_cached(document.id, document.text)
 
             # Update document metadata
             document.keywords = doc_info.keywords
@@ -208,8 +433,10 @@ class DocumentHandler(FileSystemEventHandler):
             document.summary = doc_info.summary
 
             # Save to database using DocRepo interface
-            doc_id = await db.upsert(document)
-            logger.info(f"Document processed successfully: {doc_id}")
+            doc_id, created = await db.upsert(document)
+            invalidate_search_cache()
+            result_cache.invalidate(doc_id)
+            logger.info(f"Document {'created' if created else 'updated'}: {doc_id}")
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
 
@@ -227,6 +454,8 @@ class DocumentHandler(FileSystemEventHandler):
             if doc_id:
                 # Delete the document if found
                 await db.delete(doc_id)
+                invalidate_search_cache()
+                result_cache.invalidate(doc_id)
                 logger.info(f"Document with ID {doc_id} deleted successfully")
             else:
                 logger.warning(f"No document found for deleted file: {file_path}")
@@ -251,20 +480,13 @@ class DocumentHandler(FileSystemEventHandler):
             doc_id = await db.get_id_by_path(src_path)
 
             if doc_id:
-                # Get the existing document
-                doc = await db.get(doc_id)
-                if doc:
-                    # Update the path and filename if needed
-                    doc.path = dest_path
-                    if src_filename != dest_filename:
-                        doc.filename = dest_filename
-
-                    # Update the document in the database
-                    await db.upsert(doc)
-                    logger.info(f"Document with ID {doc_id} updated with new path: {dest_path}")
-                else:
-                    logger.warning(f"Document with ID {doc_id} found but could not be retrieved")
-                    await self.process_file(dest_path)
+                # Patch path/filename in place: no need to fetch and
+                # rewrite the whole document (text included) for a rename
+                fields = {"path": dest_path}
+                if src_filename != dest_filename:
+                    fields["filename"] = dest_filename
+                await db.update_metadata(doc_id, fields)
+                logger.info(f"Document with ID {doc_id} updated with new path: {dest_path}")
             else:
                 # If we couldn't find the document by source path, process it as a new file
                 logger.info(
@@ -1,4 +1,12 @@
-from watchdog.observers import Observer
+import sys
+
+if sys.platform.startswith("linux"):
+    # Bind the inotify backend explicitly: the Observer alias silently
+    # falls back to PollingObserver (a Python-level tree rescan) when it
+    # decides inotify is unavailable, and we'd rather fail loudly
+    from watchdog.observers.inotify import InotifyObserver as Observer
+else:
+    from watchdog.observers import Observer
 from app.core.config import get_settings
 import logging
 import asyncio
@@ -40,16 +48,21 @@ class LocalDocumentWatcher(DocumentWatcher):
         loop = asyncio.get_running_loop()
         self.handler.set_loop(loop)
 
-        # Scan directory for existing files before starting the watcher
-        await self.scan_directory(watch_path)
-
-        # Start the observer in a non-blocking way
+        # Start the observer before draining the backlog: files dropped
+        # while the initial scan is still running arrive as events instead
+        # of falling into the gap between scan end and observer start
         self.observer.schedule(self.handler, str(watch_path), recursive=True)
         self.observer.start()
         logger.info(f"Started watching folder: {watch_path} (including subdirectories)")
 
-    def stop(self):
+        # Scan directory for existing files; duplicate work against early
+        # events is deduped by the handler's per-path in-flight map
+        await self.scan_directory(watch_path)
+
+    async def stop(self):
         """Stop the file watcher."""
         self.observer.stop()
-        self.observer.join()
+        # join() blocks until watchdog's thread drains; run it on the
+        # default executor so shutdown doesn't stall the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.observer.join)
         logger.info("Stopped file watcher")
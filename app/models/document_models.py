@@ -40,5 +40,6 @@ class ParsedDocument(BaseModel):
     topics: List[str] = Field(default_factory=list)  # Will be filled in later processing
     summary: Optional[str] = None  # Will be filled in later processing
 
-    # TODO: Review
-    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+    # Every field type here has a native pydantic-core schema, so the
+    # arbitrary-types escape hatch was only loosening validation
+    model_config = ConfigDict(populate_by_name=True)